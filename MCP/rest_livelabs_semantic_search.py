@@ -49,8 +49,8 @@ async def search_workshops(query: str, top_k: int = 10) -> Dict[str, Any]:
         if not vector_search_engine:
             return {"success": False, "error": "Search engine not initialized"}
         
-        # Execute the search
-        results = vector_search_engine.search_similar_workshops(
+        # Execute the search without blocking the event loop
+        results = await vector_search_engine.search_similar_workshops_async(
             query_text=query,
             top_k=min(top_k, 50)  # Cap at 50 results
         )
@@ -16,7 +16,7 @@ import os
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 from fastmcp import Client
-from utils.genai_client import OracleGenAIClient
+from utils.genai_client import get_default_client
 from utils.ai_reasoner import AIReasoner
 
 # 로깅 설정 - 애플리케이션 실행 과정 추적용
@@ -281,6 +281,7 @@ def generate_chatbot_response_with_data(user_query: str) -> tuple[str, Dict[str,
     
     # Execute dynamic multi-step workflow
     all_results = []
+    step_result = None
     step_count = 0
     max_steps = 5
     
@@ -299,18 +300,27 @@ def generate_chatbot_response_with_data(user_query: str) -> tuple[str, Dict[str,
         if current_step.get("query_modification"):
             log_step("ChatbotResponse", f"Query modification: {current_step['query_modification']}")
         
-        # Make API call for this step
-        step_result = call_rest_api(step_service, step_action, step_params)
+        # Make API call for this step - 독립적인 병렬 단계가 있으면 함께 동시 실행
+        parallel_steps = current_step.get("parallel_steps") or []
+        if parallel_steps:
+            batch = [current_step] + parallel_steps
+            log_step("ChatbotResponse", f"Running {len(batch)} independent steps concurrently")
+            batch_results = asyncio.run(run_parallel_steps(batch))
+        else:
+            batch = [current_step]
+            batch_results = [call_rest_api(step_service, step_action, step_params)]
         
-        all_results.append({
-            "step": step_count,
-            "service": step_service,
-            "action": step_action,
-            "parameters": step_params,
-            "result": step_result,
-            "reasoning": current_step.get("reasoning", ""),
-            "query_modification": current_step.get("query_modification", "")
-        })
+        for batch_step, batch_result in zip(batch, batch_results):
+            all_results.append({
+                "step": len(all_results) + 1,
+                "service": batch_step.get("service"),
+                "action": batch_step.get("tool") or batch_step.get("action"),
+                "parameters": batch_step.get("parameters", {}),
+                "result": batch_result,
+                "reasoning": batch_step.get("reasoning", ""),
+                "query_modification": batch_step.get("query_modification", "")
+            })
+        step_result = batch_results[0]
         
         # Check if current step indicates completion (LLM decision)
         if current_step.get("workflow_complete", False):
@@ -344,13 +354,14 @@ def generate_chatbot_response_with_data(user_query: str) -> tuple[str, Dict[str,
         log_step("ChatbotResponse", f"LLM decided next step: {next_service}.{next_tool}")
     
     # Process workflow results - no hardcoded logic, just collect data
-    workflow_type = "multi_step" if step_count > 1 else "single_step"
+    workflow_type = "multi_step" if len(all_results) > 1 else "single_step"
     
     # Create final result structure
     final_result = {
-        "success": len(all_results) > 0 and all_results[-1]["result"].get("success", False),
+        # Outcome of the last step the workflow followed (parallel steps are appended after it)
+        "success": step_result is not None and step_result.get("success", False),
         "workflow_type": workflow_type,
-        "total_steps": step_count,
+        "total_steps": len(all_results),
         "steps": all_results
     }
     
@@ -539,7 +550,7 @@ CONTEXT:
 """
     
     try:
-        genai_client = OracleGenAIClient()
+        genai_client = get_default_client()
         llm_response = genai_client.chat(
             prompt=formatting_prompt.format(context=context),
             model_name="meta.llama-4-scout-17b-16e-instruct",
@@ -623,6 +634,14 @@ def call_rest_api(service_key: str, action: str, params: Dict[str, Any]) -> Dict
     return asyncio.run(call_mcp_api(service_key, action, params))
 
 
+async def run_parallel_steps(steps: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """서로 독립적인 MCP 도구 호출들을 동시에 실행 (결과는 입력 순서대로 반환)"""
+    return await asyncio.gather(*(
+        call_mcp_api(step["service"], step.get("tool") or step.get("action"), step.get("parameters", {}))
+        for step in steps
+    ))
+
+
 
 def main():
     """Main Streamlit application"""
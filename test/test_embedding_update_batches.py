@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Oracle embedding write batching in workshop_embedding_pipeline
+(_byte_bounded_batches cuts the update rows into executemany batches,
+_execute_update_batch halves a batch the database runs out of memory for)
+"""
+
+import logging
+from types import SimpleNamespace
+
+import oracledb
+
+import workshop_embedding_pipeline
+from workshop_embedding_pipeline import WorkshopEmbeddingPipeline, _byte_bounded_batches
+from utils.oracle_db import to_vector_bind
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def _row(mongo_id, dimensions=4):
+    """Update row as built by update_oracle_with_embeddings (float32 vector: 4 bytes per dimension)"""
+    return {'embedding': to_vector_bind([0.5] * dimensions), 'mongo_id': mongo_id}
+
+def _database_error(code, message):
+    """DatabaseError carrying an error object with the ORA code, like the driver raises"""
+    return oracledb.DatabaseError(SimpleNamespace(code=code, message=message))
+
+class _RejectingOracleManager:
+    """Stands in for DatabaseManager: execute_many fails for batches larger than max_rows"""
+
+    def __init__(self, max_rows, code=4030, message="ORA-04030: out of process memory"):
+        self.max_rows = max_rows
+        self.code = code
+        self.message = message
+        self.batch_sizes = []
+
+    def execute_many(self, sql_query, rows_list, batch_errors=True, input_types=None):
+        self.batch_sizes.append(len(rows_list))
+        if len(rows_list) > self.max_rows:
+            raise _database_error(self.code, self.message)
+        return len(rows_list)
+
+def test_empty_input():
+    """No rows means no batches (not a single empty executemany)"""
+    assert list(_byte_bounded_batches([])) == []
+    assert list(_byte_bounded_batches(iter([]))) == []
+
+def test_row_larger_than_byte_budget():
+    """A row over ORACLE_WRITE_BYTES is still written, alone in its own batch"""
+    original = workshop_embedding_pipeline.ORACLE_WRITE_BYTES
+    workshop_embedding_pipeline.ORACLE_WRITE_BYTES = 100
+    try:
+        small_a, big, small_b = _row("a"), _row("big", dimensions=1024), _row("b")
+        batches = list(_byte_bounded_batches([small_a, big, small_b]))
+        assert batches == [[small_a], [big], [small_b]]
+
+        # A single oversized row on its own
+        assert list(_byte_bounded_batches([big])) == [[big]]
+    finally:
+        workshop_embedding_pipeline.ORACLE_WRITE_BYTES = original
+
+def test_row_count_limit():
+    """Small rows are cut at ORACLE_WRITE_BATCH rows, order is preserved"""
+    rows = [_row(str(i)) for i in range(workshop_embedding_pipeline.ORACLE_WRITE_BATCH * 2 + 1)]
+    batches = list(_byte_bounded_batches(rows))
+    assert [len(batch) for batch in batches] == [
+        workshop_embedding_pipeline.ORACLE_WRITE_BATCH, workshop_embedding_pipeline.ORACLE_WRITE_BATCH, 1,
+    ]
+    assert [row for batch in batches for row in batch] == rows
+
+def test_failed_batch_is_halved():
+    """A rejected batch is split in half until the halves go through; every row is applied once"""
+    pipeline = WorkshopEmbeddingPipeline()
+    pipeline.oracle_manager = _RejectingOracleManager(max_rows=2)
+    rows = [_row(str(i)) for i in range(7)]
+
+    assert pipeline._execute_update_batch(rows) == 7
+    # 7 -> 3 + 4, 3 -> 1 + 2, 4 -> 2 + 2
+    assert pipeline.oracle_manager.batch_sizes == [7, 3, 1, 2, 4, 2, 2]
+
+def test_single_failing_row_raises():
+    """A single row that still fails is not split further; the error reaches the caller"""
+    pipeline = WorkshopEmbeddingPipeline()
+    pipeline.oracle_manager = _RejectingOracleManager(max_rows=0)
+    try:
+        pipeline._execute_update_batch([_row("a"), _row("b")])
+    except oracledb.DatabaseError:
+        pass
+    else:
+        raise AssertionError("DatabaseError was not raised for a failing single row")
+    # 2 -> 1 (fails, raised before the second half is tried)
+    assert pipeline.oracle_manager.batch_sizes == [2, 1]
+
+def test_other_errors_are_not_split():
+    """Errors other than running out of memory (e.g. a missing table) are raised without splitting"""
+    pipeline = WorkshopEmbeddingPipeline()
+    pipeline.oracle_manager = _RejectingOracleManager(
+        max_rows=0, code=942, message="ORA-00942: table or view does not exist"
+    )
+    try:
+        pipeline._execute_update_batch([_row(str(i)) for i in range(500)])
+    except oracledb.DatabaseError:
+        pass
+    else:
+        raise AssertionError("DatabaseError was not raised")
+    assert pipeline.oracle_manager.batch_sizes == [500]
+
+if __name__ == "__main__":
+    logger.info("Starting embedding update batching tests")
+    tests = [
+        test_empty_input,
+        test_row_larger_than_byte_budget,
+        test_row_count_limit,
+        test_failed_batch_is_halved,
+        test_single_failing_row_raises,
+        test_other_errors_are_not_split,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            logger.info(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            logger.error(f"❌ {test.__name__}: {e}")
+    if failed:
+        exit(1)
+    logger.info("🎉 All embedding update batching tests passed!")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the streamed LLM response scanner in workshop_ai_enhancer
+(_JsonObjectEnd decides when to stop reading the stream, _extract_json cuts the JSON out of it)
+"""
+
+import json
+import logging
+
+from workshop_ai_enhancer import _JsonObjectEnd, _extract_json
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def _read_stream(chunks):
+    """Same loop as WorkshopAIEnhancer._chat_text: returns (text read, number of chunks consumed)"""
+    parts = []
+    object_end = _JsonObjectEnd()
+    for chunk in chunks:
+        parts.append(chunk)
+        if object_end.feed(chunk):
+            break
+    return "".join(parts).strip(), len(parts)
+
+def test_escaped_quotes_inside_strings():
+    """An escaped quote does not end the string, so the } after it is not counted"""
+    text = r'{"title": "say \"}\" now", "n": 1}'
+    object_end = _JsonObjectEnd()
+    assert object_end.feed(text)
+    assert json.loads(_extract_json(text)) == {"title": 'say "}" now', "n": 1}
+
+    # Escaped backslash right before the closing quote still closes the string
+    text = r'{"path": "C:\\", "n": 2}'
+    assert _JsonObjectEnd().feed(text)
+    assert json.loads(_extract_json(text)) == {"path": "C:\\", "n": 2}
+
+def test_braces_inside_strings():
+    """Braces inside string values neither open nor close the object"""
+    object_end = _JsonObjectEnd()
+    assert not object_end.feed('{"a": "}}}", "b": "{{"')
+    assert object_end.depth == 1
+    assert object_end.feed('}')
+    assert json.loads(_extract_json('{"a": "}}}", "b": "{{"}')) == {"a": "}}}", "b": "{{"}
+
+def test_prose_before_json():
+    """Text (including quotes and apostrophes) before the first { is skipped"""
+    text = 'Here is the "analysis" you asked for, it\'s below:\n```json\n{"difficulty": "BEGINNER"}\n```\nThanks!'
+    object_end = _JsonObjectEnd()
+    assert object_end.feed(text)
+    assert json.loads(_extract_json(text)) == {"difficulty": "BEGINNER"}
+
+def test_object_split_across_chunks():
+    """Chunk boundaries inside keys, strings, escapes and nested objects do not change the result"""
+    chunks = [
+        'Sure: {"key', 'words": ["a", "b\\', '"c"', '], "nested": {"x"', ': "}"}', '}', ' trailing prose {"ignored": 1}',
+    ]
+    text, consumed = _read_stream(chunks)
+    assert consumed == 6  # stops on the chunk that closes the object; trailing prose is never read
+    assert json.loads(_extract_json(text)) == {"keywords": ["a", 'b"c'], "nested": {"x": "}"}}
+
+def test_batch_results_object():
+    """The batched {"results": [...]} response ends at its outer brace, not the first result's"""
+    chunks = ['{"results": [{"category": "OCI"}', ', {"category": "Database"}', ']}']
+    text, consumed = _read_stream(chunks)
+    assert consumed == 3
+    assert len(json.loads(_extract_json(text))["results"]) == 2
+
+if __name__ == "__main__":
+    logger.info("Starting JSON stream parsing tests")
+    tests = [
+        test_escaped_quotes_inside_strings,
+        test_braces_inside_strings,
+        test_prose_before_json,
+        test_object_split_across_chunks,
+        test_batch_results_object,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            logger.info(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            logger.error(f"❌ {test.__name__}: {e}")
+    if failed:
+        exit(1)
+    logger.info("🎉 All JSON stream parsing tests passed!")
@@ -114,7 +114,7 @@ def test_specific_workshop_query(workshop_id=None):
                 # Handle CLOB field properly
                 if text_content:
                     try:
-                        content_str = text_content.read()
+                        content_str = text_content.read() if hasattr(text_content, 'read') else text_content
                         logger.info(f"Content length: {len(content_str)} characters")
                         logger.info(f"Content preview: {content_str[:300]}{'...' if len(content_str) > 300 else ''}")
                     except Exception as e:
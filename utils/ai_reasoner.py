@@ -5,21 +5,29 @@ Handles dynamic multi-step workflow reasoning using Oracle GenAI
 
 import json
 import logging
-from typing import Dict, Any, List, Optional
-from .genai_client import OracleGenAIClient
+from typing import Dict, Any, List, Optional, Callable, Union
+from .genai_client import get_default_client
 
 logger = logging.getLogger(__name__)
 
-def log_step(step_name: str, message: str):
-    """Log step information"""
-    logger.info(f"[{step_name}] {message}")
+# 로그에 남길 LLM JSON 응답의 최대 길이
+MAX_LOGGED_JSON_CHARS = 500
+
+def log_step(step_name: str, message: Union[str, Callable[[], str]]):
+    """Log step information
+    
+    message may be a zero-argument callable so that large payloads are only
+    formatted when INFO logging is actually enabled.
+    """
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("[%s] %s", step_name, message() if callable(message) else message)
 
 class AIReasoner:
     """AI 추론 엔진 - OCI GenAI를 사용한 도구 선택 및 쿼리 분석"""
     
     def __init__(self, services_config: Dict[str, Any]):
         log_step("AIReasoner", "AI 추론 엔진 초기화")
-        self.genai_client = OracleGenAIClient()  # Oracle GenAI 클라이언트
+        self.genai_client = get_default_client()  # 프로세스 공유 Oracle GenAI 클라이언트
         self.services = services_config
     
     def reason_about_query(self, user_query: str, previous_results: List[Dict] = None) -> Dict[str, Any]:
@@ -42,6 +50,9 @@ class AIReasoner:
         if ai_analysis.get("service") and ai_analysis.get("tool"):
             log_step("AIReasoner", f"결정된 도구({ai_analysis.get('tool')})의 파라미터 개선 시작")
             ai_analysis = self.refine_parameters(user_query, ai_analysis, previous_results, refinement_model)
+
+        # 서로 의존하지 않는 추가 도구 호출 정리 (동시 실행용)
+        ai_analysis["parallel_steps"] = self._normalize_parallel_steps(ai_analysis.get("parallel_steps"))
         
         # 결과 결합 및 모델 정보 추가
         ai_analysis["thinking_process"] = thinking_result
@@ -63,12 +74,37 @@ class AIReasoner:
                 "error": "AI 분석 실패"
             }
         
-        log_step("AIReasoner", f"AI 사고 과정: {thinking_result.get('thought_process', '사고 과정 없음')}")
+        log_step("AIReasoner", lambda: f"AI 사고 과정: {thinking_result.get('thought_process', '사고 과정 없음')}")
         log_step("AIReasoner", f"AI 선택 서비스: {ai_analysis.get('service')}, 도구: {ai_analysis.get('tool')}")
-        log_step("AIReasoner", f"최종 파라미터: {ai_analysis.get('parameters')}")
+        log_step("AIReasoner", lambda: f"최종 파라미터: {ai_analysis.get('parameters')}")
         log_step("AIReasoner", f"워크플로우 완료 상태: {ai_analysis.get('workflow_complete')}")
+        if ai_analysis.get("parallel_steps"):
+            log_step("AIReasoner", lambda: f"병렬 실행 단계: {[(s['service'], s['tool']) for s in ai_analysis['parallel_steps']]}")
         
         return ai_analysis
+
+    def _normalize_parallel_steps(self, parallel_steps: Any) -> List[Dict[str, Any]]:
+        """LLM이 반환한 parallel_steps를 검증하여 실행 가능한 단계만 남김"""
+        if not isinstance(parallel_steps, list):
+            return []
+        
+        steps = []
+        for step in parallel_steps:
+            if not isinstance(step, dict):
+                continue
+            service = step.get("service")
+            tool = step.get("tool") or step.get("action")
+            if not service or not tool or service not in self.services:
+                log_step("AIReasoner", f"잘못된 병렬 단계 무시: {step}")
+                continue
+            parameters = step.get("parameters")
+            steps.append({
+                "service": service,
+                "tool": tool,
+                "parameters": parameters if isinstance(parameters, dict) else {},
+                "reasoning": step.get("reasoning", "")
+            })
+        return steps
         
     def _create_reasoning_prompt(self, user_query: str, previous_results: List[Dict] = None) -> str:
         """LLM이 해야 할 일에 대해 생각하도록 하는 프롬프트 생성"""
@@ -78,10 +114,11 @@ class AIReasoner:
         )
         context_info = ""
         if previous_results:
-            context_info = f"\n\nPrevious Steps Completed:\n"
+            parts = ["\n\nPrevious Steps Completed:\n"]
             for i, result in enumerate(previous_results, 1):
-                context_info += f"Step {i}: {result.get('service', 'unknown')}.{result.get('action', 'unknown')} - "
-                context_info += f"{'Success' if result.get('result', {}).get('success') else 'Failed'}\n"
+                parts.append(f"Step {i}: {result.get('service', 'unknown')}.{result.get('action', 'unknown')} - ")
+                parts.append(f"{'Success' if result.get('result', {}).get('success') else 'Failed'}\n")
+            context_info = "".join(parts)
         
         return f"""You are an AI assistant analyzing a user's query to understand what information you need to give the best possible answer.
 
@@ -107,39 +144,33 @@ Analyze and respond with JSON:"""
         """
         services_desc = []
         for service_key, service_config in self.services.items():
-            service_desc = f"- {service_config.get('name', service_key)} ({service_key}): {service_config.get('description', 'No description')}"
+            service_lines = [f"- {service_config.get('name', service_key)} ({service_key}): {service_config.get('description', 'No description')}"]
             
             if service_config.get('tools_cache'):
-                tools_info = []
                 for tool in service_config['tools_cache'].get('tools', []):
                     tool_name = tool.get('name', 'unknown')
                     tool_desc = tool.get('description', 'No description')
                     
-                    tool_line = f"  * {tool_name}: {tool_desc}"
-                    
+                    param_info = ""
                     if hasattr(tool, 'inputSchema') and tool.inputSchema:
                         properties = tool.inputSchema.get('properties', {})
                         if properties:
-                            param_names = list(properties.keys())
-                            tool_line += f" (parameters: {', '.join(param_names)})"
+                            param_info = f" (parameters: {', '.join(properties.keys())})"
                     
-                    tools_info.append(tool_line)
-                
-                if tools_info:
-                    service_desc += "\n" + "\n".join(tools_info)
+                    service_lines.append(f"  * {tool_name}: {tool_desc}{param_info}")
             
-            services_desc.append(service_desc)
+            services_desc.append("\n".join(service_lines))
         
         services_text = "\n\n".join(services_desc)
         
         context_info = ""
         if previous_results:
-            context_info = f"\n\nPREVIOUS WORKFLOW CONTEXT:\n"
+            parts = ["\n\nPREVIOUS WORKFLOW CONTEXT:\n"]
             for i, result in enumerate(previous_results, 1):
                 service = result.get('service', 'unknown')
                 action = result.get('action', 'unknown')
                 success = result.get('result', {}).get('success', False)
-                context_info += f"Step {i}: {service}.{action} - {'Success' if success else 'Failed'}\n"
+                parts.append(f"Step {i}: {service}.{action} - {'Success' if success else 'Failed'}\n")
                 
                 if success and result.get('result'):
                     res_data = result['result']
@@ -147,7 +178,8 @@ Analyze and respond with JSON:"""
                         # 성공, 메시지, 오류 같은 메타데이터를 제외하고 실제 데이터 키만 추출
                         important_keys = [k for k in res_data.keys() if k not in ['success', 'message', 'error']]
                         if important_keys:
-                            context_info += f"  → Available data from this step: {', '.join(important_keys)}\n"
+                            parts.append(f"  → Available data from this step: {', '.join(important_keys)}\n")
+            context_info = "".join(parts)
         
         thinking_text = thinking_result.get("thought_process", "사고 과정 없음")
         
@@ -185,8 +217,12 @@ WORKFLOW CONTINUATION LOGIC:
 - Set "workflow_complete": false if this is an intermediate step (e.g., getting user profile before searching workshops).
 - Set "workflow_complete": true if this step should provide the final answer.
 
+PARALLEL EXECUTION (OPTIONAL):
+- If other tool calls are needed that do NOT depend on this step's output (e.g., fetching a user profile AND listing workshops), list them in "parallel_steps" so they run concurrently.
+- Never put a step in "parallel_steps" if its parameters need data from another step. Use an empty list when unsure.
+
 RESPONSE FORMAT (JSON only, no explanations):
-{{"service": "service-name", "tool": "actual-tool-name-from-list", "parameters": {{"key": "value"}}, "reasoning": "your decision process", "workflow_complete": true/false}}"""
+{{"service": "service-name", "tool": "actual-tool-name-from-list", "parameters": {{"key": "value"}}, "reasoning": "your decision process", "workflow_complete": true/false, "parallel_steps": [{{"service": "service-name", "tool": "actual-tool-name-from-list", "parameters": {{"key": "value"}}}}]}}"""
 
     def _ai_think_about_query(self, prompt: str, user_query: str, model_name: str) -> Dict[str, Any]:
         """LLM을 사용하여 쿼리에 대해 생각하도록 함"""
@@ -200,7 +236,7 @@ RESPONSE FORMAT (JSON only, no explanations):
         )
         
         if response["success"]:
-            log_step("AIThinkQuery", f"사고 과정 JSON 응답 성공: {response['json']}")
+            log_step("AIThinkQuery", lambda: f"사고 과정 JSON 응답 성공: {repr(response['json'])[:MAX_LOGGED_JSON_CHARS]}")
             return response["json"]
         else:
             log_step("AIThinkQuery", f"사고 과정 GenAI 호출 실패: {response.get('error', '알 수 없는 오류')}")
@@ -229,7 +265,7 @@ RESPONSE FORMAT (JSON only, no explanations):
         )
 
         if response["success"] and response["json"]:
-            log_step("ParameterRefiner", f"Parameter refinement successful: {response['json']}")
+            log_step("ParameterRefiner", lambda: f"Parameter refinement successful: {repr(response['json'])[:MAX_LOGGED_JSON_CHARS]}")
             # 원래 분석 결과에 개선된 파라미터와 추론 과정을 추가
             current_analysis["parameters"] = response["json"].get("refined_parameters", current_analysis["parameters"])
             current_analysis["refinement_reasoning"] = response["json"].get("reasoning", "No reasoning provided.")
@@ -270,14 +306,13 @@ RESPONSE FORMAT (JSON only, no explanations):
 
         context_info = ""
         if previous_results:
-            context_info = f"\n\nPREVIOUS WORKFLOW CONTEXT:\n"
-            context_data = []
+            parts = ["\n\nPREVIOUS WORKFLOW CONTEXT:\n"]
             for i, result in enumerate(previous_results, 1):
                 service = result.get('service', 'unknown')
                 action = result.get('action', 'unknown')
                 success = result.get('result', {}).get('success', False)
                 
-                step_summary = f"Step {i}: {service}.{action} - {'Success' if success else 'Failed'}"
+                parts.append(f"Step {i}: {service}.{action} - {'Success' if success else 'Failed'}\n")
                 
                 if success and result.get('result'):
                     res_data = result['result']
@@ -285,9 +320,8 @@ RESPONSE FORMAT (JSON only, no explanations):
                         # 실제 결과 데이터만 JSON 문자열로 요약
                         data_payload = {k: v for k, v in res_data.items() if k not in ['success', 'message', 'error']}
                         if data_payload:
-                           step_summary += f"\n  → Result data: {json.dumps(data_payload)}"
-                context_data.append(step_summary)
-            context_info = "\n".join(context_data)
+                            parts.append(f"  → Result data: {json.dumps(data_payload)}\n")
+            context_info = "".join(parts)
 
 
         return f"""You are an AI assistant that refines and validates tool parameters based on the full context.
@@ -324,12 +358,12 @@ RESPONSE FORMAT (JSON only, no prose, no markdown):
         response = self.genai_client.chat_json(
             prompt=prompt,
             model_name=model_name,
-            max_tokens=200,
+            max_tokens=400,
             retry_on_invalid_json=True
         )
         
         if response["success"]:
-            log_step("AIMakeDecision", f"JSON 응답 성공적으로 받음: {response['json']}")
+            log_step("AIMakeDecision", lambda: f"JSON 응답 성공적으로 받음: {repr(response['json'])[:MAX_LOGGED_JSON_CHARS]}")
             return response["json"]
         else:
             log_step("AIMakeDecision", f"GenAI 호출 실패: {response.get('error', '알 수 없는 오류')}")
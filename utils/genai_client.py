@@ -6,6 +6,7 @@ Provides a clean interface for Oracle Generative AI API calls
 
 import json
 import logging
+from functools import lru_cache
 from typing import Dict, Any, Optional
 import oci
 from oci.generative_ai_inference import GenerativeAiInferenceClient
@@ -283,6 +284,22 @@ Raw content:
             }
 
 
+@lru_cache(maxsize=4)
+def get_default_client(config_file: Optional[str] = None) -> OracleGenAIClient:
+    """Return a process-wide shared GenAI client
+    
+    The OCI config read and SDK client setup happen once per config file;
+    later callers reuse the same instance (and its HTTP connection pool).
+    
+    Args:
+        config_file: Path to OCI config file (defaults to ~/.oci/config)
+        
+    Returns:
+        Shared OracleGenAIClient instance
+    """
+    return OracleGenAIClient(config_file)
+
+
 # Convenience function for simple usage
 def chat_with_genai(prompt: str, 
                    model_name: str = "xai.grok-4",
@@ -300,7 +317,7 @@ def chat_with_genai(prompt: str,
         Response text or empty string on error
     """
     try:
-        client = OracleGenAIClient()
+        client = get_default_client()
         response = client.chat(prompt, model_name, temperature, max_tokens)
         return response.get("text", "")
     except Exception as e:
@@ -325,7 +342,7 @@ def chat_json_with_genai(prompt: str,
         Parsed JSON dict or None on error
     """
     try:
-        client = OracleGenAIClient()
+        client = get_default_client()
         response = client.chat_json(prompt, model_name, temperature, max_tokens)
         return response.get("json") if response["success"] else None
     except Exception as e:
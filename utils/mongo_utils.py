@@ -4,18 +4,77 @@ Common MongoDB utilities
 """
 
 import os
+import atexit
 import logging
-from pymongo import MongoClient
+import threading
+from functools import cached_property, lru_cache
+from pymongo import AsyncMongoClient, MongoClient, WriteConcern
+from pymongo.errors import BulkWriteError
 from dotenv import load_dotenv
 from urllib.parse import quote_plus
-from datetime import datetime
+from datetime import datetime, timezone
 
 logger = logging.getLogger(__name__)
 
+# insert_many 한 번에 보낼 최대 문서 수 (16MB BSON 메시지 제한 이내 유지)
+INSERT_BATCH_SIZE = 1000
+# 중복 키 오류 코드 (unique index 위반)
+DUPLICATE_KEY_ERROR = 11000
+
+@lru_cache(maxsize=4)
+def _build_uri(user, password, host, port):
+    """Build MongoDB connection string with proper escaping"""
+    if not user or not password:
+        raise ValueError("MONGO_USER and MONGO_PASSWORD must be set in .env file")
+    
+    user_escaped = quote_plus(user)
+    password_escaped = quote_plus(password)
+    
+    return (
+        f"mongodb://{user_escaped}:{password_escaped}@{host}:{port}/"
+        f"{user_escaped}?authMechanism=PLAIN&authSource=$external&ssl=true&retryWrites=false&loadBalanced=true"
+        # Wire compression is negotiated with the server; unsupported compressors are skipped
+        f"&compressors=zstd,snappy,zlib&zlibCompressionLevel=-1"
+    )
+
+# URI별로 공유되는 프로세스 전역 MongoClient (연결 풀 및 핸드셰이크 재사용)
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+
+def _get_client(uri):
+    """Return the shared MongoClient for a URI, creating it on first use"""
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(uri)
+        if client is None:
+            client = MongoClient(uri, maxPoolSize=100, minPoolSize=10, connectTimeoutMS=5000)
+            _CLIENTS[uri] = client
+        return client
+
+def close_all_clients():
+    """Close every shared MongoClient (process shutdown; registered with atexit)"""
+    with _CLIENTS_LOCK:
+        clients = list(_CLIENTS.values())
+        _CLIENTS.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception as e:
+            logger.error(f"Error closing MongoDB client: {e}")
+    if clients:
+        logger.info(f"Closed {len(clients)} MongoDB client(s)")
+
+atexit.register(close_all_clients)
+
 class MongoManager:
     """Reusable MongoDB connection and operations"""
     
-    def __init__(self, db_name=None, collection_name="livelabs_workshops"):
+    def __init__(self, db_name=None, collection_name="livelabs_workshops", batch_size=INSERT_BATCH_SIZE, fast_insert=False):
+        """
+        fast_insert: use unacknowledged writes (w=0) for bulk ingest only.
+                     Inserts return without waiting for the server, so write
+                     errors are not reported. Do not use for data that needs
+                     durability or read-after-write consistency.
+        """
         load_dotenv()
         self.mongo_user = os.getenv("MONGO_USER")
         self.mongo_password = os.getenv("MONGO_PASSWORD")
@@ -25,29 +84,28 @@ class MongoManager:
         self.collection_name = collection_name
         self.client = None
         self.db = None
-        self.collection = None
+        self._text_buffer = []
+        self._batch_size = batch_size
+        self.fast_insert = fast_insert
         
     def build_connection_string(self):
         """Build MongoDB connection string with proper escaping"""
-        if not self.mongo_user or not self.mongo_password:
-            raise ValueError("MONGO_USER and MONGO_PASSWORD must be set in .env file")
-        
-        user_escaped = quote_plus(self.mongo_user)
-        password_escaped = quote_plus(self.mongo_password)
-        
-        return (
-            f"mongodb://{user_escaped}:{password_escaped}@{self.mongo_host}:{self.mongo_port}/"
-            f"{user_escaped}?authMechanism=PLAIN&authSource=$external&ssl=true&retryWrites=false&loadBalanced=true"
-        )
+        return _build_uri(self.mongo_user, self.mongo_password, self.mongo_host, self.mongo_port)
+    
+    @cached_property
+    def collection(self):
+        """Collection handle, built lazily once per instance on a shared client"""
+        self.client = _get_client(self.build_connection_string())
+        self.db = self.client[self.db_name]
+        logger.info(f"Connected to MongoDB: {self.db_name}.{self.collection_name}")
+        if self.fast_insert:
+            return self.db.get_collection(self.collection_name, write_concern=WriteConcern(w=0))
+        return self.db[self.collection_name]
     
     def connect(self):
         """Connect to MongoDB"""
         try:
-            uri = self.build_connection_string()
-            self.client = MongoClient(uri)
-            self.db = self.client[self.db_name]
-            self.collection = self.db[self.collection_name]
-            logger.info(f"Connected to MongoDB: {self.db_name}.{self.collection_name}")
+            self.collection
             return True
         except Exception as e:
             logger.error(f"Failed to connect to MongoDB: {e}")
@@ -59,14 +117,23 @@ class MongoManager:
     
     def insert_workshops(self, workshops):
         """Insert workshops into MongoDB collection"""
-        if self.collection is None:
-            if not self.connect():
-                return False
-        
         try:
             if workshops:
-                result = self.collection.insert_many(workshops)
-                logger.info(f"Inserted {len(result.inserted_ids)} workshops into MongoDB")
+                inserted = 0
+                failed = 0
+                for start in range(0, len(workshops), self._batch_size):
+                    chunk = workshops[start:start + self._batch_size]
+                    try:
+                        result = self.collection.insert_many(chunk, ordered=False, **self._bulk_insert_options())
+                        inserted += len(result.inserted_ids)
+                    except BulkWriteError as bwe:
+                        # Unordered: the rest of the chunk is still applied, only failed docs are skipped
+                        inserted += bwe.details.get("nInserted", 0)
+                        failed += self._log_write_errors(bwe)
+                if failed:
+                    logger.warning(f"Inserted {inserted} workshops into MongoDB, {failed} failed")
+                else:
+                    logger.info(f"Inserted {inserted} workshops into MongoDB")
                 return True
             else:
                 logger.warning("No workshops to insert")
@@ -75,12 +142,77 @@ class MongoManager:
             logger.error(f"Error inserting workshops: {e}")
             return False
     
+    def _bulk_insert_options(self):
+        """Skip schema validation on bulk inserts, but only with acknowledged writes:
+        PyMongo rejects bypass_document_validation with w=0 (fast_insert)"""
+        if self.collection.write_concern.acknowledged:
+            return {"bypass_document_validation": True}
+        return {}
+    
+    @staticmethod
+    def _log_write_errors(bwe):
+        """Log per-error-code counts from a BulkWriteError and return the number of failed docs"""
+        write_errors = bwe.details.get("writeErrors", [])
+        error_counts = {}
+        for error in write_errors:
+            error_counts[error.get("code")] = error_counts.get(error.get("code"), 0) + 1
+        for code, count in error_counts.items():
+            logger.warning(f"Bulk insert write error code {code}: {count} document(s)")
+        return len(write_errors)
+    
+    def _already_stored_indexes(self, chunk, write_errors):
+        """Indexes of duplicate-key rejections whose own _id is already in the collection
+        (a duplicate on another unique field is a different document and stays failed)"""
+        duplicates = {
+            error.get("index"): chunk[error.get("index")].get("_id") for error in write_errors
+            if error.get("code") == DUPLICATE_KEY_ERROR
+        }
+        if not duplicates:
+            return set()
+        try:
+            stored = {
+                doc["_id"] for doc in self.collection.find({"_id": {"$in": list(duplicates.values())}}, {"_id": 1})
+            }
+        except Exception as e:
+            logger.error(f"Error checking duplicate workshops: {e}")
+            return set()
+        return {index for index, doc_id in duplicates.items() if doc_id in stored}
+    
+    def ensure_unique_index(self, field="id"):
+        """Create a unique ascending index on field if it does not exist yet (no-op when it does)"""
+        try:
+            self.collection.create_index([(field, 1)], unique=True)
+            return True
+        except Exception as e:
+            logger.error(f"Error creating unique index on {field}: {e}")
+            return False
+    
+    def insert_many_workshops(self, workshops):
+        """
+        Insert a batch of workshops with one unordered insert_many per chunk.
+        A failing document does not abort the rest of the batch; a duplicate-key rejection counts
+        as written only when a document with the same _id is already stored.
+        Returns the list of documents that are in the collection (for resume bookkeeping).
+        """
+        committed = []
+        for start in range(0, len(workshops), self._batch_size):
+            chunk = workshops[start:start + self._batch_size]
+            try:
+                self.collection.insert_many(chunk, ordered=False)
+                committed.extend(chunk)
+            except BulkWriteError as bwe:
+                self._log_write_errors(bwe)
+                write_errors = bwe.details.get("writeErrors", [])
+                failed_indexes = {error.get("index") for error in write_errors}
+                failed_indexes -= self._already_stored_indexes(chunk, write_errors)
+                committed.extend(doc for i, doc in enumerate(chunk) if i not in failed_indexes)
+            except Exception as e:
+                logger.error(f"Error inserting workshop batch: {e}")
+        logger.info(f"Inserted {len(committed)}/{len(workshops)} workshops into MongoDB")
+        return committed
+    
     def insert_single_workshop(self, workshop):
         """Insert a single workshop into MongoDB collection - commits per transaction"""
-        if self.collection is None:
-            if not self.connect():
-                return False
-        
         try:
             if workshop:
                 result = self.collection.insert_one(workshop)
@@ -94,54 +226,178 @@ class MongoManager:
             return False
     
     def insert_workshop_text(self, workshop_id, text_content, url):
-        """Insert workshop text content"""
+        """Buffer workshop text content; written in batches via flush()"""
+        self._text_buffer.append({
+            "workshop_id": workshop_id,
+            "text_content": text_content,
+            "url": url
+        })
+        if len(self._text_buffer) >= self._batch_size:
+            return self.flush()
+        return True
+    
+    def flush(self):
+        """Write buffered workshop texts with a single insert_many call"""
+        if not self._text_buffer:
+            return True
+        
+        documents = self._text_buffer
+        self._text_buffer = []
+        # One UTC timestamp per flush (MongoDB stores dates as UTC)
+        inserted_at = datetime.now(timezone.utc)
+        for document in documents:
+            document["inserted_at"] = inserted_at
+        try:
+            result = self.collection.insert_many(documents, ordered=False, **self._bulk_insert_options())
+            logger.info(f"Inserted {len(result.inserted_ids)} workshop texts")
+            return True
+        except BulkWriteError as bwe:
+            failed = self._log_write_errors(bwe)
+            logger.warning(f"Inserted {bwe.details.get('nInserted', 0)} workshop texts, {failed} failed")
+            return True
+        except Exception as e:
+            logger.error(f"Error inserting workshop texts: {e}")
+            return False
+    
+    def iter_workshops(self, filter_dict=None, limit=None, projection=None, sort=None, batch_size=500):
+        """Stream workshops from the collection one document at a time
+        
+        projection: fields to return (e.g. {"_id": 1, "url": 1}); omitting
+                    large fields such as text_content avoids decoding them.
+        sort: list of (key, direction) pairs, applied on the server.
+        batch_size: number of documents fetched per server round trip.
+        """
+        cursor = self.collection.find(filter_dict or {}, projection=projection).batch_size(batch_size)
+        if sort:
+            cursor = cursor.sort(sort)
+        if limit:
+            cursor = cursor.limit(limit)
+        try:
+            for doc in cursor:
+                yield doc
+        finally:
+            cursor.close()
+    
+    def iter_workshops_capped(self, fields, text_caps, filter_dict=None, limit=None, batch_size=500):
+        """Stream workshops with only fields, cutting the string fields in text_caps
+        ({field: max code points}) on the server ($substrCP) so the cut text never crosses the wire
+        """
+        projection = {field: 1 for field in fields}
+        for field, cap in text_caps.items():
+            projection[field] = {"$substrCP": [{"$ifNull": [f"${field}", ""]}, 0, cap]}
+        pipeline = [{"$match": filter_dict or {}}]
+        if limit:
+            pipeline.append({"$limit": limit})
+        pipeline.append({"$project": projection})
+        with self.collection.aggregate(pipeline, batchSize=batch_size) as cursor:
+            yield from cursor
+    
+    def find_workshops(self, filter_dict=None, limit=None, projection=None, sort=None, batch_size=500):
+        """Find workshops in collection (materialized list of iter_workshops)"""
+        try:
+            return list(self.iter_workshops(filter_dict, limit=limit, projection=projection, sort=sort, batch_size=batch_size))
+        except Exception as e:
+            logger.error(f"Error finding workshops: {e}")
+            return []
+    
+    def count_workshops(self):
+        """Count total workshops in collection"""
+        try:
+            return self.collection.count_documents({})
+        except Exception as e:
+            logger.error(f"Error counting workshops: {e}")
+            return 0
+    
+    def close(self):
+        """Flush pending writes and release this manager's handles.
+        The shared MongoClient stays open for other managers; see close_all_clients()."""
+        self.flush()
+        self.__dict__.pop("collection", None)  # drop the cached_property
+        self.client = None
+        self.db = None
+        logger.info("MongoDB manager closed")
+
+
+class AsyncMongoManager:
+    """asyncio MongoDB operations using PyMongo's native AsyncMongoClient (not Motor)"""
+    
+    def __init__(self, db_name=None, collection_name="livelabs_workshops", batch_size=INSERT_BATCH_SIZE):
+        load_dotenv()
+        self.mongo_user = os.getenv("MONGO_USER")
+        self.mongo_password = os.getenv("MONGO_PASSWORD")
+        self.mongo_host = os.getenv("MONGO_HOST")
+        self.mongo_port = os.getenv("MONGO_PORT")
+        self.db_name = db_name or self.mongo_user
+        self.collection_name = collection_name
+        self.client = None
+        self.db = None
+        self.collection = None
+        self._batch_size = batch_size
+    
+    def connect(self):
+        """Create the async client (connections are opened lazily on first use)"""
+        try:
+            uri = _build_uri(self.mongo_user, self.mongo_password, self.mongo_host, self.mongo_port)
+            self.client = AsyncMongoClient(uri)
+            self.db = self.client[self.db_name]
+            self.collection = self.db[self.collection_name]
+            logger.info(f"Connected to MongoDB (async): {self.db_name}.{self.collection_name}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to connect to MongoDB (async): {e}")
+            return False
+    
+    async def insert_workshops(self, workshops):
+        """Insert workshops into MongoDB collection"""
         if self.collection is None:
             if not self.connect():
                 return False
         
         try:
-            document = {
-                "workshop_id": workshop_id,
-                "text_content": text_content,
-                "url": url,
-                "inserted_at": datetime.now()
-            }
-            result = self.collection.insert_one(document)
-            logger.info(f"Inserted workshop text for ID {workshop_id}")
-            return True
+            if workshops:
+                inserted = 0
+                for start in range(0, len(workshops), self._batch_size):
+                    chunk = workshops[start:start + self._batch_size]
+                    result = await self.collection.insert_many(chunk, ordered=False)
+                    inserted += len(result.inserted_ids)
+                logger.info(f"Inserted {inserted} workshops into MongoDB")
+                return True
+            else:
+                logger.warning("No workshops to insert")
+                return False
         except Exception as e:
-            logger.error(f"Error inserting workshop text: {e}")
+            logger.error(f"Error inserting workshops: {e}")
             return False
     
-    def find_workshops(self, filter_dict=None, limit=None):
+    async def find_workshops(self, filter_dict=None, limit=None, projection=None, batch_size=500):
         """Find workshops in collection"""
         if self.collection is None:
             if not self.connect():
                 return []
         
         try:
-            cursor = self.collection.find(filter_dict or {})
+            cursor = self.collection.find(filter_dict or {}, projection=projection).batch_size(batch_size)
             if limit:
                 cursor = cursor.limit(limit)
-            return list(cursor)
+            return await cursor.to_list()
         except Exception as e:
             logger.error(f"Error finding workshops: {e}")
             return []
     
-    def count_workshops(self):
+    async def count_workshops(self):
         """Count total workshops in collection"""
         if self.collection is None:
             if not self.connect():
                 return 0
         
         try:
-            return self.collection.count_documents({})
+            return await self.collection.count_documents({})
         except Exception as e:
             logger.error(f"Error counting workshops: {e}")
             return 0
     
-    def close(self):
+    async def close(self):
         """Close MongoDB connection"""
         if self.client:
-            self.client.close()
-            logger.info("MongoDB connection closed") 
\ No newline at end of file
+            await self.client.close()
+            logger.info("MongoDB connection closed (async)")
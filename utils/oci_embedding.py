@@ -1,7 +1,13 @@
 import oci
 import os
 import logging
-from typing import List
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple, Union
+# SDK 세션은 벤더링된 requests를 사용 (재시도/오류 처리가 이 예외 타입을 잡음)
+# The SDK session uses its vendored requests (its retry/error handling catches these exception types)
+from oci._vendor.requests.adapters import HTTPAdapter
 
 # --- 기본 로깅 설정 / Basic Logging Setup ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -16,45 +22,112 @@ ENDPOINT = "https://inference.generativeai.us-chicago-1.oci.oraclecloud.com"
 #MODEL_ID = "cohere.embed-english-v3.0"  # 영어 전용 모델 / English-only model
 MODEL_ID = "cohere.embed-v4.0"  # 다국어 지원 모델 / Multilingual model
 
+# 요청 1회당 최대 입력 텍스트 수 (Cohere 모델 제한)
+# Maximum number of input texts per request (Cohere model limit)
+BATCH_SIZE = 96
+
+# 배치 요청을 동시에 보낼 최대 스레드 수
+# Maximum number of threads sending batch requests concurrently
+MAX_WORKERS = 8
+
+# HTTPS 연결 풀 크기 (동시 배치 요청 수보다 크게 유지)
+# HTTPS connection pool size (kept above the number of concurrent batch requests)
+POOL_MAXSIZE = 32
+
+# 일시적 오류(429/5xx/타임아웃)에 대한 지수 백오프 재시도 전략 (최대 5회, 총 60초)
+# Exponential backoff retry strategy for transient errors (429/5xx/timeouts; up to 5 attempts, 60s total)
+RETRY_STRATEGY = oci.retry.RetryStrategyBuilder(
+    max_attempts_check=True,
+    max_attempts=5,
+    total_elapsed_time_check=True,
+    total_elapsed_time_seconds=60,
+    retry_max_wait_between_calls_seconds=30,
+    retry_base_sleep_time_seconds=1,
+    backoff_type=oci.retry.BACKOFF_DECORRELATED_JITTER_VALUE
+).get_retry_strategy()
+
+# 설정별로 재사용되는 클라이언트 캐시 / Per-config cache of reusable clients
+_client_cache: Dict[Tuple, oci.generative_ai_inference.GenerativeAiInferenceClient] = {}
+_client_cache_lock = threading.Lock()
+
+def _client_cache_key(config: dict) -> Tuple:
+    """클라이언트를 식별하는 설정 값으로 캐시 키를 만듭니다.
+    Builds a cache key from the config values that identify a client."""
+    return tuple(config.get(k) for k in ("tenancy", "user", "fingerprint", "key_file", "region"))
+
 def init_client(config: dict) -> oci.generative_ai_inference.GenerativeAiInferenceClient:
-    """OCI 생성형 AI 추론 클라이언트를 초기화하고 반환합니다.
-    Initializes and returns the OCI Generative AI Inference Client."""
-    logging.info(f"엔드포인트 클라이언트 초기화 / Initializing client for endpoint: {ENDPOINT}")
-    return oci.generative_ai_inference.GenerativeAiInferenceClient(
-        config=config,  # OCI 설정 정보 / OCI configuration
-        service_endpoint=ENDPOINT,  # 서비스 엔드포인트 / Service endpoint
-        retry_strategy=oci.retry.NoneRetryStrategy(),  # 재시도 전략 없음 / No retry strategy
-        timeout=(10, 240)  # 연결 및 읽기 타임아웃 (초) / Connection and read timeout (seconds)
+    """OCI 생성형 AI 추론 클라이언트를 반환합니다. 같은 설정이면 기존 클라이언트(와 TLS 연결 풀)를 재사용합니다.
+    Returns the OCI Generative AI Inference Client, reusing the existing client (and its TLS pool) for the same config."""
+    key = _client_cache_key(config)
+    with _client_cache_lock:
+        client = _client_cache.get(key)
+        if client is not None:
+            return client
+        
+        logging.info(f"엔드포인트 클라이언트 초기화 / Initializing client for endpoint: {ENDPOINT}")
+        client = oci.generative_ai_inference.GenerativeAiInferenceClient(
+            config=config,  # OCI 설정 정보 / OCI configuration
+            service_endpoint=ENDPOINT,  # 서비스 엔드포인트 / Service endpoint
+            retry_strategy=RETRY_STRATEGY,  # 지수 백오프 재시도 (SDK 기본 서킷 브레이커 유지) / Exponential backoff retries (SDK default circuit breaker kept)
+            timeout=(10, 240)  # 연결 및 읽기 타임아웃 (초) / Connection and read timeout (seconds)
+        )
+        # 동시 배치 요청을 위해 연결 풀 확장 / Enlarge the connection pool for concurrent batch requests
+        client.base_client.session.mount("https://", HTTPAdapter(pool_connections=POOL_MAXSIZE, pool_maxsize=POOL_MAXSIZE))
+        _client_cache[key] = client
+        return client
+
+def _embed_batch(client: oci.generative_ai_inference.GenerativeAiInferenceClient, compartment_id: str, texts: List[str]) -> List[List[float]]:
+    """단일 요청으로 하나의 배치를 임베딩합니다.
+    Embeds a single batch of texts in one request."""
+    # 임베딩 요청 세부사항 구성 / Configure embedding request details
+    embed_details = oci.generative_ai_inference.models.EmbedTextDetails(
+        inputs=texts,  # 임베딩할 텍스트 목록 / List of texts to embed
+        serving_mode=oci.generative_ai_inference.models.OnDemandServingMode(model_id=MODEL_ID),  # 온디맨드 서빙 모드 / On-demand serving mode
+        compartment_id=compartment_id,  # OCI 구획 ID / OCI compartment ID
+        truncate="END"  # 텍스트가 너무 길면 끝에서 자르기 / Truncate from end if text is too long
     )
+    
+    # OCI 서비스에 임베딩 요청 / Request embeddings from OCI service
+    response = client.embed_text(embed_details)
+    return response.data.embeddings  # type: ignore
 
-def get_embeddings(client: oci.generative_ai_inference.GenerativeAiInferenceClient, compartment_id: str, texts: List[str]) -> List[List[float]]:
+def get_embeddings(client: oci.generative_ai_inference.GenerativeAiInferenceClient, compartment_id: str, texts: List[str], as_list: bool = False) -> Union[np.ndarray, List[List[float]]]:
     """
     지정된 클라이언트를 사용하여 텍스트 목록에 대한 임베딩을 생성하고 반환합니다.
+    BATCH_SIZE 단위로 나누어 동시에 요청하며, 결과는 입력 순서를 유지합니다.
+    기본적으로 (텍스트 수, 차원) 형태의 float32 numpy 배열을 반환하며, as_list=True이면 기존 List[List[float]]를 반환합니다.
     Generates and returns embeddings for a list of texts using the specified client.
+    Texts are split into BATCH_SIZE chunks sent concurrently; results keep input order.
+    Returns a float32 numpy array of shape (n_texts, dim) by default, or List[List[float]] with as_list=True.
+    On failure an empty result (len() == 0) is returned.
     """
+    empty = [] if as_list else np.empty((0, 0), dtype=np.float32)
     logging.info(f"모델 '{MODEL_ID}'를 사용하여 {len(texts)}개 텍스트에 대한 임베딩 요청")
     logging.info(f"Requesting embeddings for {len(texts)} text(s) using model '{MODEL_ID}'.")
     try:
-        # 임베딩 요청 세부사항 구성 / Configure embedding request details
-        embed_details = oci.generative_ai_inference.models.EmbedTextDetails(
-            inputs=texts,  # 임베딩할 텍스트 목록 / List of texts to embed
-            serving_mode=oci.generative_ai_inference.models.OnDemandServingMode(model_id=MODEL_ID),  # 온디맨드 서빙 모드 / On-demand serving mode
-            compartment_id=compartment_id,  # OCI 구획 ID / OCI compartment ID
-            truncate="END"  # 텍스트가 너무 길면 끝에서 자르기 / Truncate from end if text is too long
-        )
+        batches = [texts[i:i + BATCH_SIZE] for i in range(0, len(texts), BATCH_SIZE)]
+        
+        if len(batches) <= 1:
+            embeddings = _embed_batch(client, compartment_id, texts)
+        else:
+            # 하나의 클라이언트를 여러 스레드에서 공유 / Share one client across worker threads
+            with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(batches))) as executor:
+                embeddings = []
+                for batch_embeddings in executor.map(lambda batch: _embed_batch(client, compartment_id, batch), batches):
+                    embeddings.extend(batch_embeddings)
         
-        # OCI 서비스에 임베딩 요청 / Request embeddings from OCI service
-        response = client.embed_text(embed_details)
         logging.info("OCI 서비스로부터 임베딩을 성공적으로 수신했습니다.")
         logging.info("Successfully received embeddings from OCI service.")
-        return response.data.embeddings  # type: ignore
+        if as_list:
+            return embeddings
+        return np.asarray(embeddings, dtype=np.float32)
 
     except oci.exceptions.ServiceError as e:
         logging.error(f"임베딩 중 OCI 서비스 오류 / OCI Service Error during embedding: Status {e.status} - {e.message}", exc_info=True)
-        return []
+        return empty
     except Exception as e:
         logging.error(f"임베딩 중 예상치 못한 오류 발생 / An unexpected error occurred during embedding: {e}", exc_info=True)
-        return []
+        return empty
 
 def main():
     """임베딩 테스트를 실행하는 메인 함수.
@@ -84,7 +157,7 @@ def main():
         embeddings = get_embeddings(client, compartment_id, texts_to_embed)
         
         # 결과 출력 / Output results
-        if embeddings:
+        if len(embeddings):
             logging.info("--- 결과 / RESULTS ---")
             logging.info(f"성공적으로 {len(embeddings)}개의 임베딩을 생성했습니다.")
             logging.info(f"Successfully generated {len(embeddings)} embeddings.")
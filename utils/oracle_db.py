@@ -1,47 +1,177 @@
 import oracledb
+import array
 import logging
 import os
+import time
+import numpy as np
+from contextlib import contextmanager
 
 logger = logging.getLogger(__name__)
 
+# Return CLOB/BLOB columns as str/bytes instead of LOB locators (avoids a round trip per LOB read).
+# init_oracle_client() is intentionally never called so the driver stays in Thin mode.
+oracledb.defaults.fetch_lobs = False
+
+# Rows fetched per round trip for fetch_all queries
+FETCH_ARRAY_SIZE = 500
+
+# Characters written per LOB write call when streaming CLOB data
+CLOB_CHUNK_SIZE = 65536
+
+# Tag given to pooled connections whose session state has been initialized
+SESSION_TAG = "warmed"
+
+# ORA-03113/03114 (lost connection), ORA-12170 (connect timeout), ORA-12571 (packet writer failure)
+TRANSIENT_ERROR_CODES = {3113, 3114, 12170, 12571}
+# Subset raised before a statement can reach the server: the only errors writes are retried on,
+# since a lost connection may arrive after the server already committed
+PRE_EXECUTE_ERROR_CODES = {12170}
+MAX_RETRIES = 3
+
+def _tag_session(connection, requested_tag):
+    """Session callback: runs one-time session setup, then tags the connection so later acquires skip it."""
+    cursor = connection.cursor()
+    cursor.execute("ALTER SESSION SET NLS_DATE_FORMAT = 'YYYY-MM-DD HH24:MI:SS'")
+    cursor.close()
+    connection.tag = requested_tag
+
+def to_vector_bind(embedding):
+    """Converts an embedding (float32 numpy array or list of floats) to array.array('f') for binding to a VECTOR column."""
+    if isinstance(embedding, np.ndarray):
+        # Single buffer copy instead of a per-element float conversion
+        return array.array('f', embedding.astype(np.float32, copy=False).tobytes())
+    return array.array('f', embedding)
+
+def _is_plain_dml(sql_query):
+    """True for INSERT/UPDATE/DELETE/MERGE statements, whose rowcount reliably reports changes (unlike PL/SQL blocks)."""
+    parts = sql_query.split(None, 1)
+    return bool(parts) and parts[0].upper() in ("INSERT", "UPDATE", "DELETE", "MERGE")
+
+def pool_params_from_env():
+    """Builds the connection pool parameters shared by the sync and async managers from environment variables."""
+    DB_USER = os.getenv("DB_USER")
+    DB_PASSWORD = os.getenv("DB_PASSWORD")
+    DB_DSN = os.getenv("DB_DSN")
+    WALLET_LOCATION = os.getenv("WALLET_LOCATION")
+    PEM_PASSPHRASE = os.getenv("PEM_PASSPHRASE")
+
+    if not all([DB_USER, DB_PASSWORD, DB_DSN]):
+        logger.error("DATABASE_MANAGER: Database credentials (DB_USER, DB_PASSWORD, DB_DSN) are not fully set. Pool not initialized.")
+        raise ValueError("Database credentials are not properly configured.")
+
+    # Ensure wallet_location and PEM_PASSPHRASE are used if provided
+    pool_params = {
+        "user": DB_USER,
+        "password": DB_PASSWORD,
+        "dsn": DB_DSN,
+        "min": int(os.getenv("DB_POOL_MIN", "4")),
+        "max": int(os.getenv("DB_POOL_MAX", "32")),
+        "increment": 2,
+        "homogeneous": True,
+        "stmtcachesize": 100, # Reuse parsed statements for repeated queries
+        "getmode": oracledb.POOL_GETMODE_WAIT, # Wait for a free connection instead of failing under burst
+        "wait_timeout": 5000, # Milliseconds to wait for a free connection
+    }
+    if WALLET_LOCATION:
+        pool_params["config_dir"] = WALLET_LOCATION
+        pool_params["wallet_location"] = WALLET_LOCATION
+        pool_params["wallet_password"] = PEM_PASSPHRASE # If wallet is encrypted
+    return pool_params
+
+class DatabaseSession:
+    """A checked-out connection and a single shared cursor for running many statements (see DatabaseManager.session)."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.cursor = connection.cursor()
+        self._prepared_sql = None
+        self._last_types = None
+
+    def _prepare(self, sql_query):
+        """Prepares the statement only when it differs from the one already on the cursor.
+        Across cursors, reuse comes from the pool's statement cache (stmtcachesize)."""
+        if sql_query != self._prepared_sql:
+            self.cursor.prepare(sql_query)
+            self._prepared_sql = sql_query
+            self._last_types = None # Bind types belong to the previous statement
+
+    def _set_input_types(self, input_types):
+        """Calls setinputsizes only when the types differ from the ones already bound for this statement.
+        input_types may be a dict (named binds) or a tuple (positional binds, no ** unpacking)."""
+        if not input_types or input_types == self._last_types:
+            return
+        if isinstance(input_types, dict):
+            self.cursor.setinputsizes(**input_types)
+        else:
+            self.cursor.setinputsizes(*input_types)
+        self._last_types = input_types
+
+    def execute(self, sql_query, params=None, fetch_one=False, fetch_all=False, input_types=None, arraysize=None):
+        self._prepare(sql_query)
+        self._set_input_types(input_types)
+
+        if fetch_all: # Fetch large result sets in fewer round trips; pass arraysize when the row count is known
+            fetch_size = arraysize or FETCH_ARRAY_SIZE
+            self.cursor.arraysize = fetch_size
+            self.cursor.prefetchrows = fetch_size + 1
+
+        if params:
+            self.cursor.execute(None, params)
+        else:
+            self.cursor.execute(None)
+
+        if fetch_one:
+            return self.cursor.fetchone()
+        if fetch_all:
+            return self.cursor.fetchall()
+        # For DML, rowcount is more relevant.
+        return self.cursor.rowcount
+
+    def iterate(self, sql_query, params=None, input_types=None, arraysize=None):
+        """Executes a query and yields rows as the cursor fetches them (one round trip per arraysize rows)
+        instead of materializing the whole result with fetchall()."""
+        self._prepare(sql_query)
+        self._set_input_types(input_types)
+
+        fetch_size = arraysize or FETCH_ARRAY_SIZE
+        self.cursor.arraysize = fetch_size
+        self.cursor.prefetchrows = fetch_size + 1
+
+        if params:
+            self.cursor.execute(None, params)
+        else:
+            self.cursor.execute(None)
+        yield from self.cursor
+
+    def executemany(self, sql_query, rows_list, batch_errors=True, input_types=None):
+        self._prepare(sql_query)
+        self._set_input_types(input_types)
+
+        self.cursor.executemany(None, rows_list, batcherrors=batch_errors)
+
+        if batch_errors:
+            for error in self.cursor.getbatcherrors():
+                logger.error(f"DATABASE_MANAGER: Batch row {error.offset} failed: {error.message}")
+        return self.cursor.rowcount
+
+    def close(self):
+        try:
+            self.cursor.close()
+        except Exception as e:
+            logger.error(f"DATABASE_MANAGER: Error closing session cursor: {e}")
+
 class DatabaseManager:
     _pool = None
 
     @classmethod
     def initialize_pool(cls):
-        DB_USER = os.getenv("DB_USER")
-        DB_PASSWORD = os.getenv("DB_PASSWORD")
-        DB_DSN = os.getenv("DB_DSN")
-        WALLET_LOCATION = os.getenv("WALLET_LOCATION")
-        TNS_ADMIN = os.getenv("TNS_ADMIN")
-        PEM_PASSPHRASE = os.getenv("PEM_PASSPHRASE")
-
         if cls._pool is None:
-            if not all([DB_USER, DB_PASSWORD, DB_DSN]):
-                logger.error("DATABASE_MANAGER: Database credentials (DB_USER, DB_PASSWORD, DB_DSN) are not fully set. Pool not initialized.")
-                raise ValueError("Database credentials are not properly configured.")
-            
-            pool_min = 2
-            pool_max = 5
-            pool_increment = 1
+            pool_params = pool_params_from_env()
+            pool_params["session_callback"] = _tag_session # Initialize session state once per connection
             try:
-                logger.info(f"DATABASE_MANAGER: Initializing Oracle DB connection pool for DSN: {DB_DSN}")
-                # Ensure wallet_location and PEM_PASSPHRASE are used if provided
-                pool_params = {
-                    "user": DB_USER,
-                    "password": DB_PASSWORD,
-                    "dsn": DB_DSN,
-                    "min": pool_min,
-                    "max": pool_max,
-                    "increment": pool_increment,
-                }
-                if WALLET_LOCATION:
-                    pool_params["config_dir"] = WALLET_LOCATION
-                    pool_params["wallet_location"] = WALLET_LOCATION
-                    pool_params["wallet_password"] = PEM_PASSPHRASE # If wallet is encrypted
-                
+                logger.info(f"DATABASE_MANAGER: Initializing Oracle DB connection pool for DSN: {pool_params['dsn']}")
                 cls._pool = oracledb.create_pool(**pool_params)
-                logger.info(f"DATABASE_MANAGER: Connection pool initialized. Min: {pool_min}, Max: {pool_max}")
+                logger.info(f"DATABASE_MANAGER: Connection pool initialized. Min: {pool_params['min']}, Max: {pool_params['max']}")
             except oracledb.Error as e:
                 logger.error(f"DATABASE_MANAGER: Error initializing connection pool: {e}")
                 cls._pool = None # Ensure pool is None if initialization fails
@@ -71,7 +201,7 @@ class DatabaseManager:
         if pool:
             try:
                 # logger.debug("DATABASE_MANAGER: Acquiring connection from pool.")
-                return pool.acquire()
+                return pool.acquire(tag=SESSION_TAG)
             except oracledb.Error as e:
                 logger.error(f"DATABASE_MANAGER: Error acquiring connection from pool: {e}")
                 raise
@@ -101,77 +231,135 @@ class DatabaseManager:
                 logger.error(f"DATABASE_MANAGER: Unexpected error releasing connection to pool: {e}")
                 # Don't raise, just log the error
 
-    def execute_query(self, sql_query, params=None, fetch_one=False, fetch_all=False, commit=False, is_ddl=False, input_types=None):
-        conn = None
+    @contextmanager
+    def session(self, commit=True, rollback_on_error=True):
+        """
+        Keeps one pooled connection checked out for many statements.
+        Usage:
+            with db_manager.session() as session:
+                session.execute(sql, params)
+                session.executemany(sql, rows)
+        Commits once on successful exit (if commit=True), rolls back on error, then releases the connection.
+        """
+        conn = self.get_connection()
+        session = DatabaseSession(conn)
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            # logger.debug(f"DATABASE_MANAGER: Executing query: {sql_query} with params: {params}")
-            
-            if input_types: # Set input types if provided
-                cursor.setinputsizes(**input_types)
-                # logger.debug(f"DATABASE_MANAGER: Set input types: {input_types}")
-
-            if params:
-                cursor.execute(sql_query, params)
-            else:
-                cursor.execute(sql_query)
-
-            result = None
-            if fetch_one:
-                result = cursor.fetchone()
-            elif fetch_all:
-                result = cursor.fetchall()
-            
-            rowcount = cursor.rowcount # Store rowcount before cursor is closed
-
-            if commit or is_ddl: # DDL statements often require commit or have auto-commit
+            yield session
+            if commit:
                 conn.commit()
-                # logger.debug(f"DATABASE_MANAGER: Query committed. SQL: {sql_query[:100]}...")
-            
-            cursor.close()
-            # For fetch operations, result includes data. For DML, rowcount is more relevant.
-            return result if (fetch_one or fetch_all) else rowcount
-        
-        except oracledb.Error as oe:
-            logger.error(f"DATABASE_MANAGER: Oracle DB error executing query: {sql_query[:100]}... Error: {oe}")
-            if conn and not is_ddl: # Don't rollback DDL typically
+        except Exception:
+            if rollback_on_error:
                 try:
                     conn.rollback()
                 except Exception as r_err:
                     logger.error(f"DATABASE_MANAGER: Error during rollback: {r_err}")
+            raise
+        finally:
+            session.close()
+            try:
+                self.release_connection(conn)
+            except Exception as e:
+                logger.error(f"DATABASE_MANAGER: Error in finally block releasing connection: {e}")
+                # Don't raise, just log the error
+
+    def _with_retries(self, fn, *args, retries=MAX_RETRIES, error_codes=TRANSIENT_ERROR_CODES, **kwargs):
+        """Runs fn, retrying with exponential backoff when the connection drops transiently
+        (error_codes). The failed connection has already been released by the time fn raises."""
+        for attempt in range(retries + 1):
+            try:
+                return fn(*args, **kwargs)
+            except oracledb.DatabaseError as e:
+                error = e.args[0] if e.args else None
+                if attempt >= retries or getattr(error, "code", None) not in error_codes:
+                    raise
+                delay = 2 ** attempt * 0.1
+                logger.warning(f"DATABASE_MANAGER: Transient DB error (attempt {attempt + 1}/{retries + 1}), retrying in {delay:.1f}s: {e}")
+                time.sleep(delay)
+
+    def execute_query(self, sql_query, params=None, fetch_one=False, fetch_all=False, commit=False, is_ddl=False, input_types=None, arraysize=None):
+        # Committing statements are only retried on errors raised before they could execute
+        error_codes = PRE_EXECUTE_ERROR_CODES if (commit or is_ddl) else TRANSIENT_ERROR_CODES
+        return self._with_retries(
+            self._execute_query, sql_query, params, fetch_one=fetch_one, fetch_all=fetch_all, commit=commit,
+            is_ddl=is_ddl, input_types=input_types, arraysize=arraysize, error_codes=error_codes
+        )
+
+    def ping(self):
+        """
+        Fail-fast connectivity check: builds the shared pool on first use and does one
+        round trip on a pooled connection (no SQL parse/execute). Returns True if the database answered.
+        """
+        conn = None
+        try:
+            conn = self.get_connection()
+            conn.ping()
+            return True
+        except Exception as e:
+            logger.error(f"DATABASE_MANAGER: Ping failed: {e}")
+            return False
+        finally:
+            if conn:
+                self.release_connection(conn)
+
+    def execute_clob_insert_or_update(self, *args, **kwargs):
+        # Always a write: retried only on errors raised before the statement could execute
+        return self._with_retries(self._execute_clob_insert_or_update, *args, error_codes=PRE_EXECUTE_ERROR_CODES, **kwargs)
+
+    def _execute_query(self, sql_query, params=None, fetch_one=False, fetch_all=False, commit=False, is_ddl=False, input_types=None, arraysize=None):
+        if commit and (fetch_one or fetch_all):
+            logger.warning(f"DATABASE_MANAGER: commit=True ignored for fetch query: {sql_query[:100]}...")
+            commit = False
+        try:
+            # DDL statements often require commit or have auto-commit; don't rollback DDL typically
+            with self.session(commit=False, rollback_on_error=not is_ddl) as session:
+                result = session.execute(sql_query, params, fetch_one=fetch_one, fetch_all=fetch_all, input_types=input_types, arraysize=arraysize)
+                # Skip the commit round trip when a plain DML statement changed no rows
+                if is_ddl or (commit and not (result == 0 and _is_plain_dml(sql_query))):
+                    session.connection.commit()
+                return result
+        except oracledb.Error as oe:
+            logger.error(f"DATABASE_MANAGER: Oracle DB error executing query: {sql_query[:100]}... Error: {oe}")
             raise # Re-raise the original Oracle error to be handled by the caller
         except OSError as oe:
             logger.error(f"DATABASE_MANAGER: OS error executing query: {sql_query[:100]}... Error: {oe}")
-            if conn and not is_ddl:
-                try:
-                    conn.rollback()
-                except Exception as r_err:
-                    logger.error(f"DATABASE_MANAGER: Error during rollback: {r_err}")
             raise # Re-raise the OS error
         except Exception as e:
             logger.error(f"DATABASE_MANAGER: Unexpected error executing query: {sql_query[:100]}... Error: {e}")
-            if conn and not is_ddl:
-                try:
-                    conn.rollback()
-                except Exception as r_err:
-                    logger.error(f"DATABASE_MANAGER: Error during rollback: {r_err}")
             raise # Re-raise the unexpected error
-        finally:
-            if conn:
-                try:
-                    self.release_connection(conn)
-                except Exception as e:
-                    logger.error(f"DATABASE_MANAGER: Error in finally block releasing connection: {e}")
-                    # Don't raise, just log the error
-                        # Don't raise, just log the error
-        
-        # If we get here, all retries failed
-        if last_error:
-            raise last_error
-
-    def execute_clob_insert_or_update(self, sql_query, params_dict_with_clob_fields, clob_fields_and_values):
+
+    def execute_iter(self, sql_query, params=None, input_types=None, arraysize=None):
+        """
+        Streams the rows of a query. The pooled connection stays checked out until the
+        generator is exhausted or closed, so consume it promptly (not retried, unlike execute_query).
+        """
+        try:
+            with self.session(commit=False) as session:
+                yield from session.iterate(sql_query, params, input_types=input_types, arraysize=arraysize)
+        except oracledb.Error as oe:
+            logger.error(f"DATABASE_MANAGER: Oracle DB error streaming query: {sql_query[:100]}... Error: {oe}")
+            raise
+
+    def execute_many(self, sql_query, rows_list, batch_errors=True, input_types=None):
+        """
+        Executes one DML statement for many rows in a single round trip (array DML).
+        rows_list: list of bind tuples or dicts.
+        batch_errors: if True, failing rows are reported and the rest are still applied.
+        Returns the total number of affected rows.
+        """
+        if not rows_list:
+            return 0
+
+        try:
+            with self.session() as session:
+                return session.executemany(sql_query, rows_list, batch_errors=batch_errors, input_types=input_types)
+        except oracledb.Error as oe:
+            logger.error(f"DATABASE_MANAGER: Oracle DB error during executemany: {sql_query[:100]}... Error: {oe}")
+            raise
+        except Exception as e:
+            logger.error(f"DATABASE_MANAGER: Unexpected error during executemany: {sql_query[:100]}... Error: {e}")
+            raise
+
+    def _execute_clob_insert_or_update(self, sql_query, params_dict_with_clob_fields, clob_fields_and_values):
         """ 
         Handles insert/update with CLOB data.
         clob_fields_and_values: a dict like {'clob_column_name': 'large string data'}
@@ -183,11 +371,14 @@ class DatabaseManager:
             conn = self.get_connection()
             cursor = conn.cursor()
 
-            # Create LOB objects for CLOB fields
+            # Bind CLOB fields directly as LOBs
+            cursor.setinputsizes(**{field_name: oracledb.DB_TYPE_CLOB for field_name in clob_fields_and_values})
+
+            # Create LOB objects for CLOB fields, streaming the data in chunks
             lob_vars = {}
             for field_name, data_string in clob_fields_and_values.items():
                 lob_var = cursor.createlob(oracledb.DB_TYPE_CLOB)
-                lob_var.write(data_string if data_string is not None else "") # Handle None by writing empty string
+                self._write_lob_chunked(lob_var, data_string if data_string is not None else "") # Handle None by writing empty string
                 lob_vars[field_name] = lob_var
             
             # Update the main params dictionary with these LOB variables
@@ -212,6 +403,16 @@ class DatabaseManager:
             if conn:
                 self.release_connection(conn)
 
+    @staticmethod
+    def _write_lob_chunked(lob_var, data):
+        """Writes data into a CLOB in CLOB_CHUNK_SIZE pieces (offsets are 1-based)."""
+        offset = 1
+        for i in range(0, len(data), CLOB_CHUNK_SIZE):
+            chunk = data[i:i + CLOB_CHUNK_SIZE]
+            lob_var.write(chunk, offset)
+            # CLOB offsets count UTF-16 code units, so non-BMP characters take two
+            offset += len(chunk.encode("utf-16-le")) // 2
+
     @classmethod
     def close_pool(cls):
         if cls._pool:
@@ -0,0 +1,140 @@
+import oracledb
+import logging
+
+from .oracle_db import pool_params_from_env, FETCH_ARRAY_SIZE
+
+logger = logging.getLogger(__name__)
+
+class AsyncDatabaseManager:
+    """asyncio counterpart of DatabaseManager built on python-oracledb's native async API (Thin mode).
+    Use from FastAPI/asyncio code so DB calls do not block the event loop; scripts keep using DatabaseManager."""
+    _pool = None
+
+    @classmethod
+    def create_pool_async(cls):
+        if cls._pool is None:
+            pool_params = pool_params_from_env()
+            try:
+                logger.info(f"ASYNC_DATABASE_MANAGER: Initializing async Oracle DB connection pool for DSN: {pool_params['dsn']}")
+                cls._pool = oracledb.create_pool_async(**pool_params)
+                logger.info(f"ASYNC_DATABASE_MANAGER: Connection pool initialized. Min: {pool_params['min']}, Max: {pool_params['max']}")
+            except oracledb.Error as e:
+                logger.error(f"ASYNC_DATABASE_MANAGER: Error initializing connection pool: {e}")
+                cls._pool = None # Ensure pool is None if initialization fails
+                raise
+
+    @classmethod
+    def get_pool(cls):
+        if cls._pool is None:
+            cls.create_pool_async()
+        return cls._pool
+
+    async def get_connection(self):
+        pool = self.get_pool()
+        if pool:
+            try:
+                return await pool.acquire()
+            except oracledb.Error as e:
+                logger.error(f"ASYNC_DATABASE_MANAGER: Error acquiring connection from pool: {e}")
+                raise
+        else:
+            logger.error("ASYNC_DATABASE_MANAGER: Connection pool is not available.")
+            raise RuntimeError("Database connection pool is not initialized.")
+
+    async def release_connection(self, connection):
+        pool = self.get_pool()
+        if pool and connection:
+            try:
+                await pool.release(connection)
+            except Exception as e:
+                logger.error(f"ASYNC_DATABASE_MANAGER: Error releasing connection to pool: {e}")
+                # Don't raise, just log the error
+
+    async def execute_query(self, sql_query, params=None, fetch_one=False, fetch_all=False, commit=False, is_ddl=False, input_types=None, arraysize=None):
+        conn = None
+        try:
+            conn = await self.get_connection()
+            cursor = conn.cursor()
+
+            if input_types: # Set input types if provided
+                cursor.setinputsizes(**input_types)
+
+            if fetch_all: # Fetch large result sets in fewer round trips
+                fetch_size = arraysize or FETCH_ARRAY_SIZE
+                cursor.arraysize = fetch_size
+                cursor.prefetchrows = fetch_size + 1
+
+            if params:
+                await cursor.execute(sql_query, params)
+            else:
+                await cursor.execute(sql_query)
+
+            result = None
+            if fetch_one:
+                result = await cursor.fetchone()
+            elif fetch_all:
+                result = await cursor.fetchall()
+
+            rowcount = cursor.rowcount
+
+            if commit or is_ddl:
+                await conn.commit()
+
+            cursor.close()
+            return result if (fetch_one or fetch_all) else rowcount
+
+        except Exception as e:
+            logger.error(f"ASYNC_DATABASE_MANAGER: Error executing query: {sql_query[:100]}... Error: {e}")
+            if conn and not is_ddl: # Don't rollback DDL typically
+                try:
+                    await conn.rollback()
+                except Exception as r_err:
+                    logger.error(f"ASYNC_DATABASE_MANAGER: Error during rollback: {r_err}")
+            raise
+        finally:
+            if conn:
+                await self.release_connection(conn)
+
+    async def execute_many(self, sql_query, rows_list, batch_errors=True, input_types=None):
+        """Async version of DatabaseManager.execute_many. Returns the total number of affected rows."""
+        if not rows_list:
+            return 0
+
+        conn = None
+        try:
+            conn = await self.get_connection()
+            cursor = conn.cursor()
+
+            if input_types:
+                cursor.setinputsizes(**input_types)
+
+            await cursor.executemany(sql_query, rows_list, batcherrors=batch_errors)
+            rowcount = cursor.rowcount
+
+            if batch_errors:
+                for error in cursor.getbatcherrors():
+                    logger.error(f"ASYNC_DATABASE_MANAGER: Batch row {error.offset} failed: {error.message}")
+
+            await conn.commit()
+            cursor.close()
+            return rowcount
+        except Exception as e:
+            logger.error(f"ASYNC_DATABASE_MANAGER: Error during executemany: {sql_query[:100]}... Error: {e}")
+            if conn:
+                await conn.rollback()
+            raise
+        finally:
+            if conn:
+                await self.release_connection(conn)
+
+    @classmethod
+    async def close_pool(cls):
+        if cls._pool:
+            try:
+                logger.info("ASYNC_DATABASE_MANAGER: Closing connection pool.")
+                await cls._pool.close(force=True)
+                cls._pool = None
+            except oracledb.Error as e:
+                logger.error(f"ASYNC_DATABASE_MANAGER: Error closing connection pool: {e}")
+        else:
+            logger.info("ASYNC_DATABASE_MANAGER: Connection pool was not initialized or already closed.")
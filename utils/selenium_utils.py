@@ -4,8 +4,11 @@ Selenium utilities for web scraping with anti-detection measures
 """
 
 import time
+import queue
+import atexit
 import random
 import logging
+import threading
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
@@ -18,14 +21,189 @@ from webdriver_manager.chrome import ChromeDriverManager
 
 logger = logging.getLogger(__name__)
 
+# Common overlay selectors, checked in this order
+_OVERLAY_SELECTORS = [
+    'div.truste_overlay',
+    'div[id^="pop-div"]',
+    '.modal-overlay',
+    '.cookie-banner',
+    '.privacy-notice',
+    'button[aria-label="Close"]',
+    'button.close',
+    '.close-button'
+]
+
+# 보이는 첫 overlay를 찾아 닫기 버튼 클릭(없으면 제거)까지 브라우저 안에서 한 번에 처리 - 매칭된 selector 반환
+_CLOSE_OVERLAY_JS = """
+for (const sel of arguments[0]) {
+    for (const el of document.querySelectorAll(sel)) {
+        const r = el.getBoundingClientRect();
+        if (r.width > 0 && r.height > 0) {
+            const btn = el.querySelector('button, .close, [aria-label*="close" i]');
+            if (btn) { btn.click(); } else { el.remove(); }
+            return sel;
+        }
+    }
+}
+return null;
+"""
+
+_QUERY_TEXT_JS = "const e = document.querySelector(arguments[0]); return e ? e.innerText : '';"
+
+# iframe 전체를 브라우저 안에서 한 번에 탐색 - same-origin frame은 btn_toggle 클릭 후 selector 조회,
+# cross-origin frame(contentDocument 접근 불가)은 index만 돌려주고 Python 쪽 switch_to 경로로 처리
+_FRAME_SCAN_JS = """
+const sel = arguments[0];
+const frames = document.querySelectorAll('iframe');
+const blocked = [];
+for (let i = 0; i < frames.length; i++) {
+    let doc = null;
+    try { doc = frames[i].contentDocument; } catch (err) { doc = null; }
+    if (!doc) { blocked.push(i); continue; }
+    const toggle = doc.getElementById('btn_toggle');
+    if (toggle && toggle.offsetParent !== null) { toggle.click(); }
+    const e = doc.querySelector(sel);
+    if (e && e.innerText) { return {text: e.innerText, frame: i, blocked: blocked}; }
+}
+return {text: '', frame: -1, blocked: blocked};
+"""
+
+# 새 문서마다 주입되는 event 기반 wait helper - MutationObserver가 selector 요소가 clickable 해지면 resolve
+# (replaces WebDriverWait's 500ms polling with a single async-script round trip)
+_WAIT_FOR_JS = """
+window.__waitFor = window.__waitFor || function(sel, timeoutMs) {
+    const ready = () => {
+        const e = document.querySelector(sel);
+        if (!e) return null;
+        const r = e.getBoundingClientRect();
+        return (r.width > 0 && r.height > 0 && !e.disabled) ? e : null;
+    };
+    return new Promise(resolve => {
+        const found = ready();
+        if (found) return resolve(found);
+        const timer = setTimeout(() => { observer.disconnect(); resolve(null); }, timeoutMs);
+        const observer = new MutationObserver(() => {
+            const e = ready();
+            if (e) { observer.disconnect(); clearTimeout(timer); resolve(e); }
+        });
+        observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true});
+    });
+};
+"""
+
+class BrowserPool:
+    """
+    Process-wide pool of Chrome drivers so scrapes reuse a warm browser instead of paying
+    Chrome start-up on every SeleniumDriver. Each driver is replaced after max_uses acquisitions.
+    """
+    maxsize = 4
+    max_uses = 50
+    _idle = {}      # headless flag -> queue.Queue of idle drivers
+    _uses = {}      # id(driver) -> acquisition count
+    _lock = threading.Lock()
+    
+    @classmethod
+    def _queue(cls, headless):
+        with cls._lock:
+            if headless not in cls._idle:
+                cls._idle[headless] = queue.Queue(maxsize=cls.maxsize)
+            return cls._idle[headless]
+    
+    @classmethod
+    def acquire(cls, headless, factory):
+        """Return an idle driver (in a fresh tab) or launch a new one with factory()"""
+        idle = cls._queue(headless)
+        while True:
+            try:
+                driver = idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                driver.switch_to.new_window('tab')
+                with cls._lock:
+                    cls._uses[id(driver)] = cls._uses.get(id(driver), 0) + 1
+                logger.info("Reusing pooled Chrome driver")
+                return driver
+            except Exception as e:
+                logger.warning(f"Discarding broken pooled driver: {e}")
+                cls._discard(driver)
+        
+        driver = factory()
+        if driver is not None:
+            with cls._lock:
+                cls._uses[id(driver)] = 1
+        return driver
+    
+    @classmethod
+    def release(cls, driver, headless):
+        """Close the task tab and return the driver to the pool, quitting it once worn out or the pool is full"""
+        if driver is None:
+            return
+        try:
+            handles = driver.window_handles
+            if len(handles) > 1:
+                driver.close()
+                driver.switch_to.window(handles[0])
+        except Exception as e:
+            logger.warning(f"Pooled driver unusable on release: {e}")
+            cls._discard(driver)
+            return
+        
+        with cls._lock:
+            uses = cls._uses.get(id(driver), 0)
+        if uses >= cls.max_uses:
+            logger.info(f"Driver reached {cls.max_uses} uses - replacing it")
+            cls._discard(driver)
+            return
+        try:
+            cls._queue(headless).put_nowait(driver)
+        except queue.Full:
+            cls._discard(driver)
+    
+    @classmethod
+    def _discard(cls, driver):
+        with cls._lock:
+            cls._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f"Error quitting driver: {e}")
+    
+    @classmethod
+    def close_all(cls):
+        """Quit every idle driver (registered with atexit)"""
+        with cls._lock:
+            queues = list(cls._idle.values())
+        for idle in queues:
+            while True:
+                try:
+                    cls._discard(idle.get_nowait())
+                except queue.Empty:
+                    break
+
+atexit.register(BrowserPool.close_all)
+
 class SeleniumDriver:
     """Enhanced Selenium driver with anti-detection measures"""
     
     def __init__(self, headless=True):
         self.headless = headless
         self.driver = None
+    
+    def __enter__(self):
+        self.setup_driver()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.quit()
+        return False
         
     def setup_driver(self):
+        """Acquire a Chrome driver from BrowserPool, launching a new one only when none is idle"""
+        self.driver = BrowserPool.acquire(self.headless, lambda: self.driver if self._launch_driver() else None)
+        return self.driver is not None
+    
+    def _launch_driver(self):
         """Setup Chrome driver with anti-detection measures"""
         try:
             options = Options()
@@ -123,6 +301,12 @@ class SeleniumDriver:
             # Execute stealth script
             self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
             
+            # Register the event-driven wait helper for every document loaded from now on
+            try:
+                self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": _WAIT_FOR_JS})
+            except Exception as e:
+                logger.warning(f"Could not register wait helper via CDP, falling back to polling waits: {e}")
+            
             # Set random viewport
             width = random.randint(1200, 1920)
             height = random.randint(800, 1080)
@@ -145,50 +329,55 @@ class SeleniumDriver:
         try:
             self.random_delay(1, 2)
             
-            # Common overlay selectors
-            overlay_selectors = [
-                'div.truste_overlay',
-                'div[id^="pop-div"]',
-                '.modal-overlay',
-                '.cookie-banner',
-                '.privacy-notice',
-                'button[aria-label="Close"]',
-                'button.close',
-                '.close-button'
-            ]
-            
-            for selector in overlay_selectors:
-                try:
-                    overlays = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    if overlays:
-                        for overlay in overlays:
-                            if overlay.is_displayed():
-                                # Try to find close button within overlay
-                                close_buttons = overlay.find_elements(By.CSS_SELECTOR, 'button, .close, [aria-label*="close"], [aria-label*="Close"]')
-                                if close_buttons:
-                                    close_buttons[0].click()
-                                    logger.info(f"Closed overlay with selector: {selector}")
-                                    self.random_delay(1, 2)
-                                    break
-                                else:
-                                    # Remove overlay with JavaScript
-                                    self.driver.execute_script("arguments[0].remove();", overlay)
-                                    logger.info(f"Removed overlay with selector: {selector}")
-                                    self.random_delay(1, 2)
-                                    break
-                except Exception as e:
-                    continue
+            # Find, close or remove the first visible overlay in a single WebDriver round trip
+            matched = self.driver.execute_script(_CLOSE_OVERLAY_JS, _OVERLAY_SELECTORS)
+            if matched:
+                logger.info(f"Closed overlay with selector: {matched}")
+                self.random_delay(1, 2)
                     
         except Exception as e:
             logger.warning(f"No overlay to close or error closing overlay: {e}")
     
+    def _wait_for_clickable(self, by, value, timeout):
+        """Event-driven wait through window.__waitFor; polls with WebDriverWait only when the helper cannot be used"""
+        selector = None
+        if by == By.CSS_SELECTOR:
+            selector = value
+        elif by == By.ID:
+            selector = f'[id="{value}"]'
+        
+        if selector is not None:
+            # Pooled drivers are shared, so the script timeout is put back for the next borrower
+            previous_timeout = None
+            try:
+                previous_timeout = self.driver.timeouts.script
+                self.driver.set_script_timeout(timeout + 5)
+                return self.driver.execute_async_script(
+                    _WAIT_FOR_JS + "window.__waitFor(arguments[0], arguments[1]).then(arguments[arguments.length - 1]);",
+                    selector, int(timeout * 1000)
+                )
+            except TimeoutException:
+                raise
+            except Exception as e:
+                logger.debug(f"Event-driven wait unavailable for {selector}, polling instead: {e}")
+            finally:
+                if previous_timeout is not None:
+                    try:
+                        self.driver.set_script_timeout(previous_timeout)
+                    except Exception as e:
+                        logger.debug(f"Could not restore script timeout: {e}")
+        
+        return WebDriverWait(self.driver, timeout).until(
+            EC.element_to_be_clickable((by, value))
+        )
+    
     def wait_and_click(self, by, value, description="element", timeout=30):
         """Wait for element and click with retry mechanism"""
         try:
             # Wait for element to be present and clickable
-            element = WebDriverWait(self.driver, timeout).until(
-                EC.element_to_be_clickable((by, value))
-            )
+            element = self._wait_for_clickable(by, value, timeout)
+            if element is None:
+                raise TimeoutException(f"{description} not clickable after {timeout}s")
             
             # Scroll element into view
             self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
@@ -261,28 +450,39 @@ class SeleniumDriver:
         # Try main page first
         try:
             self.try_click_btn_toggle()
-            text_content = self.driver.execute_script(
-                f"return document.querySelector('{selector}') ? document.querySelector('{selector}').innerText : ''"
-            )
+            text_content = self.driver.execute_script(_QUERY_TEXT_JS, selector)
             if text_content:
                 logger.info(f"Found text in main page with selector: {selector}")
                 return text_content
         except Exception as e:
             logger.warning(f"Error searching main page: {e}")
         
-        # Search all iframes
+        # Search all same-origin iframes in one JavaScript call
+        try:
+            result = self.driver.execute_script(_FRAME_SCAN_JS, selector)
+            text_content = result.get('text', '')
+            if text_content:
+                logger.info(f"Found text in iframe {result['frame'] + 1} with selector: {selector}")
+                return text_content
+            blocked = result.get('blocked', [])
+            if not blocked:
+                return text_content
+        except Exception as e:
+            logger.warning(f"Error scanning iframes with JavaScript: {e}")
+            blocked = None
+        
+        # Cross-origin iframes (or a failed scan) fall back to switching into each frame
         try:
             iframes = self.driver.find_elements(By.TAG_NAME, "iframe")
-            logger.info(f"Searching {len(iframes)} iframes for text")
+            indices = range(len(iframes)) if blocked is None else [i for i in blocked if i < len(iframes)]
+            logger.info(f"Searching {len(indices)} iframes for text via frame switching")
             
-            for idx, iframe in enumerate(iframes):
+            for idx in indices:
                 try:
-                    self.driver.switch_to.frame(iframe)
+                    self.driver.switch_to.frame(iframes[idx])
                     self.try_click_btn_toggle()
                     
-                    text_content = self.driver.execute_script(
-                        f"return document.querySelector('{selector}') ? document.querySelector('{selector}').innerText : ''"
-                    )
+                    text_content = self.driver.execute_script(_QUERY_TEXT_JS, selector)
                     
                     self.driver.switch_to.default_content()
                     
@@ -300,10 +500,8 @@ class SeleniumDriver:
         return text_content
     
     def quit(self):
-        """Quit the driver"""
+        """Return the driver to BrowserPool (it is quit there once worn out, or at interpreter exit)"""
         if self.driver:
-            try:
-                self.driver.quit()
-                logger.info("Driver quit successfully")
-            except Exception as e:
-                logger.warning(f"Error quitting driver: {e}") 
\ No newline at end of file
+            BrowserPool.release(self.driver, self.headless)
+            self.driver = None
+            logger.info("Driver released to pool") 
\ No newline at end of file
@@ -7,11 +7,14 @@ Converts input text to embedding and finds closest matches in Oracle database
 import logging
 import os
 import json
+import asyncio
+import functools
 import numpy as np
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Literal, Iterable, Iterator
 from utils.oci_embedding import init_client, get_embeddings
-from utils.oracle_db import DatabaseManager
+from utils.oracle_db import DatabaseManager, DatabaseSession, to_vector_bind
 import oci
+import oracledb
 
 # Configure logging
 logging.basicConfig(
@@ -28,6 +31,77 @@ try:
 except ImportError:
     logger.info("python-dotenv not available, using system environment variables")
 
+# Maximum characters of description/text_content returned per search result
+MAX_TEXT_CHARS = 4000
+
+# Result columns per projection: (SELECT expression, result key). 'lean' skips the CLOB columns entirely.
+_SEARCH_COLUMNS = {
+    'full': [
+        ("w.id", 'id'),
+        ("w.mongo_id", 'mongo_id'),
+        ("w.title", 'title'),
+        ("'https://livelabs.oracle.com' || w.url", 'url'),
+        ("w.description", 'description'),
+        ("w.author", 'author'),
+        ("w.difficulty", 'difficulty'),
+        ("w.category", 'category'),
+        ("w.duration_estimate", 'duration_estimate'),
+        ("w.text_content", 'text_content'),
+        ("vector_distance(w.cohere4_embedding, :query_vector, COSINE)", 'similarity'),
+    ],
+    'lean': [
+        ("w.id", 'id'),
+        ("w.title", 'title'),
+        ("'https://livelabs.oracle.com' || w.url", 'url'),
+        ("vector_distance(w.cohere4_embedding, :query_vector, COSINE)", 'similarity'),
+    ],
+}
+
+# Use Oracle's native vector_distance function with COSINE similarity
+# APPROX lets the optimizer use the HNSW vector index (LIVELABS_WK_HNSW) instead of a full scan;
+# rows without an embedding are filtered out (an exact scan would otherwise return them with NULL similarity)
+# CLOB columns come back as str directly (oracledb.defaults.fetch_lobs = False in utils.oracle_db)
+_SEARCH_SQL = {
+    projection: """
+            SELECT 
+                """ + ",\n                ".join(f"{expr} AS {key}" for expr, key in columns) + """
+            FROM admin.livelabs_workshops2 w
+            WHERE w.cohere4_embedding IS NOT NULL
+            ORDER BY vector_distance(w.cohere4_embedding, :query_vector, COSINE)
+            FETCH APPROX FIRST :top_k ROWS ONLY WITH TARGET ACCURACY 95
+            """
+    for projection, columns in _SEARCH_COLUMNS.items()
+}
+_SEARCH_KEYS = {projection: [key for _, key in columns] for projection, columns in _SEARCH_COLUMNS.items()}
+
+def _search_params(query_embedding, top_k: int) -> Dict[str, Any]:
+    # Bind the embedding natively as a float32 VECTOR (no text serialization/parsing)
+    return {
+        'query_vector': to_vector_bind(query_embedding),
+        'top_k': top_k
+    }
+
+def _rows_to_workshops(rows, projection: str) -> Iterator[Dict[str, Any]]:
+    keys = _SEARCH_KEYS[projection]
+    for row in rows:
+        # Column order must match the SELECT for this projection
+        workshop = dict(zip(keys, row))
+        for key in ('description', 'text_content'):
+            if workshop.get(key):
+                workshop[key] = workshop[key][:MAX_TEXT_CHARS]
+        yield workshop
+
+@functools.lru_cache(maxsize=1024)
+def _cached_embed(oci_client, compartment_id: str, text: str) -> np.ndarray:
+    """Embed a single text, memoized per (client, compartment, text).
+    Failures raise so they are never cached; the returned vector is read-only because it is shared."""
+    embeddings = get_embeddings(oci_client, compartment_id, [text])
+    if len(embeddings) != 1:
+        raise RuntimeError("Failed to generate embedding")
+    embedding_vector = embeddings[0]
+    embedding_vector.setflags(write=False)
+    return embedding_vector
+
 class VectorSearchEngine:
     """Vector search engine for LiveLabs workshops"""
     
@@ -43,9 +117,8 @@ class VectorSearchEngine:
         # Initialize Oracle connection
         try:
             self.oracle_manager = DatabaseManager()
-            # Test connection
-            test_result = self.oracle_manager.execute_query("SELECT 1 FROM DUAL", fetch_one=True)
-            if test_result:
+            # Test connection (one ping on a pooled connection; the pool is shared process-wide)
+            if self.oracle_manager.ping():
                 logger.info("✅ Oracle connection established")
             else:
                 raise Exception("Oracle connection test failed")
@@ -68,112 +141,124 @@ class VectorSearchEngine:
         
         return True
     
-    def text_to_embedding(self, text: str) -> List[float]:
+    def text_to_embedding(self, text: str) -> np.ndarray:
         """Convert input text to embedding vector"""
         try:
             logger.info(f"Converting text to embedding: '{text}'")
             
-            # Generate embedding for the input text
-            embeddings = get_embeddings(self.oci_client, self.compartment_id, [text])
-            
-            if embeddings and len(embeddings) == 1:
-                embedding_vector = embeddings[0]
-                logger.info(f"✅ Generated embedding with {len(embedding_vector)} dimensions")
-                return embedding_vector
-            else:
-                logger.error("❌ Failed to generate embedding")
-                return None
+            # Generate (or reuse the cached) embedding for the input text
+            embedding_vector = _cached_embed(self.oci_client, self.compartment_id, text)
+            logger.info(f"✅ Generated embedding with {len(embedding_vector)} dimensions")
+            return embedding_vector
                 
         except Exception as e:
             logger.error(f"❌ Error generating embedding: {e}")
             return None
     
-    def search_similar_workshops(self, query_text: str, top_k: int = 10) -> List[Dict[str, Any]]:
-        """Search for similar workshops using Oracle's native vector search"""
+    def texts_to_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Convert several texts to embedding vectors with a single batched request"""
+        logger.info(f"Converting {len(texts)} texts to embeddings")
+        embeddings = get_embeddings(self.oci_client, self.compartment_id, texts)
+        if len(embeddings) != len(texts):
+            logger.error("❌ Failed to generate embeddings")
+            return None
+        logger.info(f"✅ Generated {len(embeddings)} embeddings")
+        return embeddings
+    
+    def search_similar_workshops(self, query_text: str, top_k: int = 10, projection: Literal['full', 'lean'] = 'full') -> List[Dict[str, Any]]:
+        """Search for similar workshops using Oracle's native vector search.
+        projection='lean' returns only id, title, url and similarity (no CLOB columns)."""
         logger.info(f"=== Vector Search for: '{query_text}' ===")
         
         # Convert query text to embedding
         query_embedding = self.text_to_embedding(query_text)
-        if not query_embedding:
+        if query_embedding is None:
             logger.error("❌ Failed to generate query embedding")
             return []
         
+        return self.search_similar_workshops_with_embedding(query_embedding, top_k, projection)
+    
+    def search_similar_workshops_with_embedding(self, query_embedding: np.ndarray, top_k: int = 10, projection: Literal['full', 'lean'] = 'full') -> List[Dict[str, Any]]:
+        """Run Oracle's native vector search for an already computed query embedding"""
         try:
-            # Convert embedding list to Oracle vector format
-            # Oracle expects the vector in a specific format
-            embedding_str = "[" + ",".join(map(str, query_embedding)) + "]"
-            
-            # Use Oracle's native vector_distance function with COSINE similarity
-            # Handle CLOB columns using DBMS_LOB package
-            query = """
-            SELECT 
-                w.id,
-                w.mongo_id,
-                w.title,
-                'https://livelabs.oracle.com' || w.url AS url,
-                DBMS_LOB.SUBSTR(w.description, 4000, 1) AS description,
-                w.author,
-                w.difficulty,
-                w.category,
-                w.duration_estimate,
-                DBMS_LOB.SUBSTR(w.text_content, 4000, 1) AS text_content,
-                vector_distance(w.cohere4_embedding, :query_vector, COSINE) AS similarity
-            FROM admin.livelabs_workshops2 w
-            WHERE w.cohere4_embedding IS NOT NULL
-            ORDER BY similarity
-            FETCH FIRST :top_k ROWS ONLY
-            """
-            
-            params = {
-                'query_vector': embedding_str,
-                'top_k': top_k
-            }
-            
-            results = self.oracle_manager.execute_query(query, params=params, fetch_all=True)
-            
-            if results:
-                workshops = []
-                for row in results:
-                    # Column order must match the SELECT above
-                    workshop = {
-                        'id': row[0],
-                        'mongo_id': row[1],
-                        'title': row[2],
-                        'url': row[3],
-                        'description': row[4],
-                        'author': row[5],
-                        'difficulty': row[6],
-                        'category': row[7],
-                        'duration_estimate': row[8],
-                        'text_content': row[9],
-                        'similarity': row[10]
-                    }
-                    workshops.append(workshop)
-                
+            workshops = list(self.iter_similar_workshops_with_embedding(query_embedding, top_k, projection))
+            if workshops:
                 logger.info(f"✅ Found {len(workshops)} similar workshops using Oracle vector search")
-                return workshops
             else:
                 logger.warning("⚠️  No similar workshops found")
-                return []
+            return workshops
                 
         except Exception as e:
             logger.error(f"❌ Error in vector search: {e}")
             return []
     
-    def display_search_results(self, results: List[Dict[str, Any]], query_text: str):
-        """Display search results in a formatted way"""
+    def iter_similar_workshops_with_embedding(self, query_embedding: np.ndarray, top_k: int = 10, projection: Literal['full', 'lean'] = 'full') -> Iterator[Dict[str, Any]]:
+        """Yield search results as the cursor fetches them instead of building the full list (errors are raised)"""
+        rows = self.oracle_manager.execute_iter(
+            _SEARCH_SQL[projection],
+            params=_search_params(query_embedding, top_k),
+            input_types={'query_vector': oracledb.DB_TYPE_VECTOR},
+            arraysize=top_k # All top_k rows arrive with the execute round trip
+        )
+        yield from _rows_to_workshops(rows, projection)
+    
+    async def search_similar_workshops_async(self, query_text: str, top_k: int = 10, projection: Literal['full', 'lean'] = 'full') -> List[Dict[str, Any]]:
+        """Non-blocking search for asyncio callers: the OCI embedding call and the Oracle connection
+        checkout run concurrently in worker threads, so latency is max(embed, acquire) rather than the sum."""
+        logger.info(f"=== Vector Search (async) for: '{query_text}' ===")
+        connection = None
+        try:
+            query_embedding, connection = await asyncio.gather(
+                asyncio.to_thread(self.text_to_embedding, query_text),
+                asyncio.to_thread(self.oracle_manager.get_connection),
+                return_exceptions=True
+            )
+            if isinstance(connection, BaseException):
+                error, connection = connection, None
+                raise error
+            if query_embedding is None or isinstance(query_embedding, BaseException):
+                logger.error("❌ Failed to generate query embedding")
+                return []
+            
+            workshops = await asyncio.to_thread(self._search_on_connection, connection, query_embedding, top_k, projection)
+            logger.info(f"✅ Found {len(workshops)} similar workshops using Oracle vector search")
+            return workshops
+        except Exception as e:
+            logger.error(f"❌ Error in vector search: {e}")
+            return []
+        finally:
+            if connection is not None:
+                self.oracle_manager.release_connection(connection)
+    
+    def _search_on_connection(self, connection, query_embedding: np.ndarray, top_k: int, projection: str) -> List[Dict[str, Any]]:
+        """Run the vector search on an already checked-out connection"""
+        session = DatabaseSession(connection)
+        try:
+            rows = session.iterate(
+                _SEARCH_SQL[projection],
+                _search_params(query_embedding, top_k),
+                input_types={'query_vector': oracledb.DB_TYPE_VECTOR},
+                arraysize=top_k
+            )
+            return list(_rows_to_workshops(rows, projection))
+        finally:
+            session.close()
+    
+    def display_search_results(self, results: Iterable[Dict[str, Any]], query_text: str):
+        """Display search results in a formatted way (results may be a lazy iterator)"""
         logger.info(f"\n=== Search Results for: '{query_text}' ===")
         
-        if not results:
-            logger.info("No similar workshops found")
-            return
-        
+        i = 0
         for i, result in enumerate(results, 1):
             similarity = result['similarity']
             
             logger.info(f"\n{i}. Similarity: {similarity:.4f}")
             logger.info(f"   Title: {result.get('title', 'N/A')}")
             logger.info(f"   ID: {result.get('id', 'N/A')}")
+            if 'author' not in result:
+                # Lean projection: only id/title/url/similarity were fetched
+                logger.info(f"   URL: {result.get('url', 'N/A')}")
+                continue
             logger.info(f"   Author: {result.get('author', 'N/A')}")
             logger.info(f"   Difficulty: {result.get('difficulty', 'N/A')}")
             logger.info(f"   Category: {result.get('category', 'N/A')}")
@@ -190,14 +275,21 @@ class VectorSearchEngine:
                 # Truncate long text content
                 content_preview = text_content[:200] + "..." if len(text_content) > 200 else text_content
                 logger.info(f"   Content: {content_preview}")
+        
+        if i == 0:
+            logger.info("No similar workshops found")
     
     def cleanup(self):
-        """Clean up connections"""
+        """Clean up connections
+        
+        The Oracle pool is process-wide and shared with other engines/services,
+        so it is left open here; call DatabaseManager.close_pool() at process exit.
+        """
         logger.info("=== Cleaning Up Connections ===")
         
         if self.oracle_manager:
-            DatabaseManager.close_pool()
-            logger.info("Oracle connection pool closed")
+            self.oracle_manager = None
+            logger.info("Oracle manager released (connection pool kept for reuse)")
 
 def main():
     """Main function to run vector search"""
@@ -229,12 +321,20 @@ def main():
             "APEX development"
         ]
         
-        for query in search_queries:
-            # Perform vector search
-            results = search_engine.search_similar_workshops(query, top_k=10)
-            
-            # Display results
-            search_engine.display_search_results(results, query)
+        # Embed all queries in one request, then search with each vector
+        embeddings = search_engine.texts_to_embeddings(search_queries)
+        if embeddings is None:
+            logger.error("❌ Failed to generate query embeddings")
+            exit(1)
+        
+        for query, embedding in zip(search_queries, embeddings):
+            # Perform vector search, displaying rows as they are fetched
+            logger.info(f"=== Vector Search for: '{query}' ===")
+            try:
+                results = search_engine.iter_similar_workshops_with_embedding(embedding, top_k=10)
+                search_engine.display_search_results(results, query)
+            except Exception as e:
+                logger.error(f"❌ Error in vector search: {e}")
             
             logger.info("\n" + "="*80 + "\n")
     
@@ -243,6 +343,7 @@ def main():
         exit(1)
     finally:
         search_engine.cleanup()
+        DatabaseManager.close_pool()
 
 if __name__ == "__main__":
     main()
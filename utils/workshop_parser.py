@@ -4,59 +4,76 @@ Common workshop parsing utilities
 """
 
 import re
-import json
+import os
+import orjson
 import logging
-from bs4 import BeautifulSoup
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from lxml import html as lxml_html
+from lxml.etree import ParserError, XPath
 
 logger = logging.getLogger(__name__)
 
+# 카드 파싱용 XPath - 모듈 로드 시 한 번만 컴파일 (compiled once per process, reused for every card)
+_CARDS = XPath(".//div[contains(concat(' ', normalize-space(@class), ' '), ' a-CardView ')]")
+_LINK = XPath(".//a[contains(concat(' ', normalize-space(@class), ' '), ' a-CardView-fullLink ')]/@href")
+_TITLE = XPath("(.//span[contains(@style, 'font-weight:700')])[1]//text()")
+_DESC = XPath(".//div[contains(concat(' ', normalize-space(@class), ' '), ' a-CardView-mainContent ')]")
+_CLOCK = XPath("(.//span[contains(concat(' ', normalize-space(@class), ' '), ' fa-clock-o ')])[1]//text()")
+_SUBCONTENT = XPath(".//div[contains(concat(' ', normalize-space(@class), ' '), ' a-CardView-subContent ')]")
+
+_WID_RE = re.compile(r'wid=(\d+)')
+_VIEWS_RE = re.compile(r'(\d+)\s+Views')
+
+_JSON_OPTIONS = orjson.OPT_INDENT_2
+
+def _element_text(element):
+    """Same result as BeautifulSoup get_text(strip=True): stripped text nodes joined without separator"""
+    return ''.join(part.strip() for part in element.itertext())
+
+def _iter_card_fields(tree):
+    """
+    Single pass over the card list: yields the raw (link hrefs, title text, description div,
+    clock text, sub-content div) results of the compiled XPaths for each card
+    """
+    for card in _CARDS(tree):
+        yield _LINK(card), _TITLE(card), _DESC(card), _CLOCK(card), _SUBCONTENT(card)
+
 class WorkshopParser:
     """Reusable workshop parsing functionality"""
     
     @staticmethod
     def extract_workshops_beautifulsoup(html_content):
         """
-        Parse workshops using BeautifulSoup - most readable and maintainable
+        Parse workshop cards with lxml and the precompiled XPath expressions above.
+        An empty or unparsable page yields no workshops (like BeautifulSoup did) instead of raising
         """
-        soup = BeautifulSoup(html_content, 'html.parser')
+        if not html_content or not html_content.strip():
+            logger.warning("Empty page source, no workshops to parse")
+            return []
+        try:
+            tree = lxml_html.fromstring(html_content)
+        except (ParserError, ValueError) as e:
+            logger.warning(f"Error parsing page source: {e}")
+            return []
         workshops = []
         
-        # Find all workshop cards
-        cards = soup.find_all('div', class_='a-CardView')
-        
-        for card in cards:
+        for hrefs, title_parts, desc_divs, clock_parts, subcontent in _iter_card_fields(tree):
             try:
                 # Extract workshop ID from URL
-                link = card.find('a', class_='a-CardView-fullLink')
-                href = link.get('href', '') if link else ''
-                wid_match = re.search(r'wid=(\d+)', href)
-                workshop_id = wid_match.group(1) if wid_match else None
+                href = hrefs[0] if hrefs else ''
+                wid_match = _WID_RE.search(href)
                 
-                # Extract title
-                title_span = card.find('span', style=lambda x: x and 'font-weight:700' in x)
-                title = title_span.get_text(strip=True) if title_span else ''
-                
-                # Extract description
-                desc_div = card.find('div', class_='a-CardView-mainContent')
-                description = desc_div.get_text(strip=True) if desc_div else ''
-                
-                # Extract duration
-                clock_span = card.find('span', class_='fa fa-clock-o')
-                duration = clock_span.get_text(strip=True) if clock_span else ''
-                
-                # Extract views
-                subcontent = card.find('div', class_='a-CardView-subContent')
                 views = None
                 if subcontent:
-                    views_match = re.search(r'(\d+)\s+Views', subcontent.get_text())
+                    views_match = _VIEWS_RE.search(subcontent[0].text_content())
                     views = int(views_match.group(1)) if views_match else None
                 
                 workshops.append({
-                    'id': workshop_id,
-                    'title': title,
-                    'description': description,
-                    'duration': duration,
+                    'id': wid_match.group(1) if wid_match else None,
+                    'title': ''.join(part.strip() for part in title_parts),
+                    'description': _element_text(desc_divs[0]) if desc_divs else '',
+                    'duration': ''.join(part.strip() for part in clock_parts),
                     'views': views,
                     'url': href.replace('&amp;', '&')
                 })
@@ -67,6 +84,19 @@ class WorkshopParser:
         
         return workshops
     
+    @staticmethod
+    def extract_workshops_many(html_pages, max_workers=None):
+        """
+        Parse several page HTMLs in parallel worker processes (parsing is CPU-bound and holds the GIL).
+        Returns one workshop list per page, in the same order as html_pages.
+        """
+        if len(html_pages) <= 1:
+            return [WorkshopParser.extract_workshops_beautifulsoup(html) for html in html_pages]
+        
+        workers = min(max_workers or os.cpu_count() or 1, len(html_pages))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_parse_page, html_pages))
+    
     @staticmethod
     def save_workshops_to_json(workshops, filename, page_number=1, total_pages=1):
         """Save workshops to JSON file with metadata"""
@@ -79,8 +109,9 @@ class WorkshopParser:
                 "workshops": workshops
             }
             
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            # orjson은 UTF-8 bytes를 바로 기록
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(data, option=_JSON_OPTIONS))
             
             logger.info(f"Workshops saved to {filename}")
             return True
@@ -93,8 +124,8 @@ class WorkshopParser:
     def load_workshops_from_json(filename):
         """Load workshops from JSON file"""
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(filename, 'rb') as f:
+                data = orjson.loads(f.read())
             return data.get('workshops', [])
         except Exception as e:
             logger.error(f"Error loading from JSON: {e}")
@@ -119,4 +150,8 @@ class WorkshopParser:
                 print(f"   Views: {workshop.get('views', 'N/A')}")
                 print()
         
-        print("="*60) 
\ No newline at end of file
+        print("="*60) 
+
+def _parse_page(html_content):
+    """Process-pool entry point (module-level so it pickles by reference)"""
+    return WorkshopParser.extract_workshops_beautifulsoup(html_content)
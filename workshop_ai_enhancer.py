@@ -23,11 +23,22 @@ Enhances workshop data using OCI GenAI and imports to MongoDB collections
 Provides AI-powered metadata extraction, categorization, and content enrichment
 """
 
+import re
 import json
+import hashlib
+import ijson
+import orjson
+import asyncio
 import logging
 import os
+import uuid
 from datetime import datetime
-from typing import Dict, Any
+from itertools import islice
+from functools import lru_cache
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+import diskcache
 from dotenv import load_dotenv
 
 # Import OCI GenAI utilities
@@ -35,7 +46,7 @@ import oci
 from oci.generative_ai_inference import GenerativeAiInferenceClient
 from oci.generative_ai_inference import models as genai_models
 
-from utils.mongo_utils import MongoManager
+from utils.mongo_utils import MongoManager, INSERT_BATCH_SIZE
 
 # Load environment variables
 load_dotenv()
@@ -44,6 +55,135 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Maximum number of workshops being enhanced (OCI chat requests in flight) at once
+ENHANCE_CONCURRENCY = 16
+# Enhanced workshops are written to MongoDB in batches of this size
+MONGO_BATCH_SIZE = 100
+
+# Workshops packed into one chat request by the batch enhancement path
+ENHANCE_BATCH_SIZE = 5
+# Number of text_content length bins used to form batches of similar size
+LENGTH_BINS = 5
+# On-disk cache of LLM enhancement results keyed by content hash (re-runs skip unchanged workshops)
+ENHANCE_CACHE_DIR = ".enhance_cache"
+
+# Static instructions sent as the system message: byte-identical on every request so providers
+# that cache prompt prefixes can reuse it; the user message carries only the workshop data
+SYSTEM_PROMPT = """Oracle LiveLabs 워크샵 정보를 분석해 메타데이터를 JSON으로만 응답하세요.
+워크샵이 하나이면 아래 형식의 객체 하나로 응답합니다.
+여러 워크샵(### Workshop 1, ### Workshop 2, ...)이면 {"results": [...]} 배열에 입력 순서대로 워크샵마다 정확히 하나의 객체를 넣습니다.
+
+형식:
+{"keywords": ["주요 키워드들"], "author": "작성자 또는 기관명", "difficulty": "BEGINNER|INTERMEDIATE|ADVANCED", "category": "주요 카테고리", "duration_estimate": "예상 소요 시간", "resource_type": "WORKSHOP|TUTORIAL|GUIDE|DEMO", "source": "Oracle LiveLabs", "language": "ko|en"}
+
+분석 기준:
+- keywords: 워크샵 내용에서 추출한 주요 기술 키워드들
+- author: Oracle 또는 관련 기관명
+- difficulty: 내용의 복잡도에 따라 판단
+- category: 주요 기술 영역 (예: OCI, Database, Security, etc.)
+- duration_estimate: 워크샵 제목이나 내용에서 추정
+- resource_type: 워크샵 형태에 따라 판단
+- language: 한국어/영어 등 언어 구분"""
+
+def _workshop_info(workshop_data: Dict[str, Any]) -> str:
+    """Workshop information for AI analysis (text limited for the prompt)"""
+    return (
+        f"제목: {workshop_data.get('title', 'N/A')}\n"
+        f"설명: {workshop_data.get('description', 'N/A')}\n"
+        f"텍스트 내용: {workshop_data.get('text_content', '')[:2000]}\n"
+        f"URL: {workshop_data.get('url', 'N/A')}"
+    )
+
+# LLM/stream payload parser (orjson; raises orjson.JSONDecodeError, a json.JSONDecodeError subclass).
+# Swap back to json.loads here if ever needed.
+_loads = orjson.loads
+
+# ```json fenced object, otherwise the outermost {...} span (surrounding prose is ignored)
+_JSON_RE = re.compile(r'```json\s*(\{.*?\})\s*```|(\{.*\})', re.DOTALL)
+
+def _extract_json(text: str) -> str:
+    """Extract the JSON part of an LLM response (```json fenced block or outermost braces)"""
+    match = _JSON_RE.search(text)
+    if match:
+        return match.group(1) or match.group(2)
+    # Fallback heuristic (e.g. a fence without a closing brace pair)
+    if "```json" in text:
+        json_start = text.find("```json") + 7
+        json_end = text.find("```", json_start)
+        return text[json_start:json_end].strip()
+    start = text.find("{")
+    end = text.rfind("}") + 1
+    return text[start:end]
+
+# Changing the system prompt invalidates cached enhancements
+_PROMPT_HASH = hashlib.sha256(SYSTEM_PROMPT.encode('utf-8')).hexdigest()[:16]
+
+def _content_key(workshop_data: Dict[str, Any], model_id: str) -> str:
+    """Cache key for a workshop: model + system prompt hash + sha256 of the fields that go into the prompt"""
+    content = (
+        (workshop_data.get('title') or '')
+        + (workshop_data.get('description') or '')
+        + (workshop_data.get('text_content') or '')[:2000]
+    )
+    return f"{model_id}:{_PROMPT_HASH}:{hashlib.sha256(content.encode('utf-8')).hexdigest()}"
+
+class _JsonObjectEnd:
+    """Incremental brace counter for streamed text: feed() returns True once the first top-level
+    {...} object is complete (braces inside JSON strings are ignored, text before it is skipped)"""
+    
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+    
+    def feed(self, text: str) -> bool:
+        for ch in text:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == '\\':
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '{':
+                self.depth += 1
+            elif ch == '}' and self.depth:
+                self.depth -= 1
+                if not self.depth:
+                    return True
+            elif ch == '"' and self.depth:
+                self.in_string = True
+        return False
+
+def _iter_stream_text(response):
+    """Yield the text deltas of a streamed (is_stream=True) OCI chat response (server-sent events)"""
+    for event in response.data.events():
+        data = _loads(event.data)
+        for content in (data.get("message") or {}).get("content") or []:
+            if content.get("text"):
+                yield content["text"]
+
+@lru_cache(maxsize=1)
+def _enhance_cache():
+    """Open the enhancement cache on first use (thread- and process-safe)"""
+    return diskcache.Cache(ENHANCE_CACHE_DIR)
+
+@lru_cache(maxsize=4)
+def _load_genai_client(config_file_path, config_profile, endpoint):
+    """Read the OCI config and build the GenAI client once per (config file, profile, endpoint).
+    Returns (client, tenancy OCID)."""
+    oci_config = oci.config.from_file(
+        file_location=config_file_path,
+        profile_name=config_profile
+    )
+    client = GenerativeAiInferenceClient(
+        config=oci_config,
+        service_endpoint=endpoint,
+        retry_strategy=oci.retry.NoneRetryStrategy(),
+        timeout=(10, 240)
+    )
+    return client, oci_config.get("tenancy")
+
 class WorkshopAIEnhancer:
     """AI-powered workshop data enhancer using OCI GenAI for metadata extraction"""
     
@@ -54,27 +194,34 @@ class WorkshopAIEnhancer:
         self.config_file_path = os.path.expanduser(os.getenv('OCI_CONFIG_PATH', '~/.oci/config'))
         self.config_profile = os.getenv('OCI_CONFIG_PROFILE', 'DEFAULT')
         
+        # Timestamps formatted once per enhancer (one import run), shared by every document it builds
+        now = datetime.now()
+        self.created_at = now.strftime('%Y-%m-%d')
+        self._fallback_id_prefix = f"workshop_{now.strftime('%Y%m%d_%H%M%S')}_"
+        
         self.client = self._initialize_client()
+        
+        # Request parts that are identical for every call, built once
+        self._serving_mode = genai_models.OnDemandServingMode(model_id=self.model_id)
+        self._system_message = genai_models.Message(
+            role="SYSTEM", content=[genai_models.TextContent(text=SYSTEM_PROMPT, type="TEXT")]
+        )
+        self._chat_request_template = {
+            "api_format": genai_models.BaseChatRequest.API_FORMAT_GENERIC,
+            "temperature": 0.3,
+            # Tokens arrive as they are generated; _chat_text stops reading once the JSON object is complete
+            "is_stream": True
+        }
     
     def _initialize_client(self):
-        """Initialize OCI Generative AI client"""
+        """Initialize OCI Generative AI client (shared by enhancers with the same config)"""
         try:
-            oci_config = oci.config.from_file(
-                file_location=self.config_file_path,
-                profile_name=self.config_profile
-            )
+            client, tenancy = _load_genai_client(self.config_file_path, self.config_profile, self.endpoint)
             
-            if not self.compartment_id and oci_config.get("tenancy"):
-                self.compartment_id = oci_config.get("tenancy")
+            if not self.compartment_id and tenancy:
+                self.compartment_id = tenancy
                 logger.info(f"Using tenancy ID {self.compartment_id} as compartment ID")
             
-            client = GenerativeAiInferenceClient(
-                config=oci_config,
-                service_endpoint=self.endpoint,
-                retry_strategy=oci.retry.NoneRetryStrategy(),
-                timeout=(10, 240)
-            )
-            
             logger.info(f"OCI GenAI client initialized with model: {self.model_id}")
             return client
             
@@ -82,128 +229,214 @@ class WorkshopAIEnhancer:
             logger.error(f"Failed to initialize OCI client: {e}")
             return None
     
+    def _chat_details(self, prompt: str, max_tokens: int):
+        """Build the OCI chat request for a prompt (only the user message and max_tokens vary per call)"""
+        content = genai_models.TextContent(text=prompt, type="TEXT")
+        message = genai_models.Message(role="USER", content=[content])
+        
+        chat_request = genai_models.GenericChatRequest(
+            messages=[self._system_message, message],
+            max_tokens=max_tokens,
+            **self._chat_request_template
+        )
+        
+        return genai_models.ChatDetails(
+            serving_mode=self._serving_mode,
+            chat_request=chat_request,
+            compartment_id=self.compartment_id
+        )
+    
+    def _chat_text(self, chat_details) -> str:
+        """Send a chat request and read the streamed answer until its JSON object closes.
+        The rest of the stream (closing fence, trailing prose) is not waited for."""
+        response = self.client.chat(chat_details)
+        parts = []
+        object_end = _JsonObjectEnd()
+        try:
+            for text in _iter_stream_text(response):
+                parts.append(text)
+                if object_end.feed(text):
+                    break
+        finally:
+            response.data.close()
+        return "".join(parts).strip()
+    
+    def _build_chat_details(self, workshop_data: Dict[str, Any]):
+        """Build the OCI chat request for one workshop"""
+        return self._chat_details(_workshop_info(workshop_data), max_tokens=1000)
+    
+    def _build_batch_chat_details(self, workshops: List[Dict[str, Any]]):
+        """Build one OCI chat request covering several workshops (### Workshop 1, ### Workshop 2, ...)"""
+        user_prompt = "\n\n".join(
+            f"### Workshop {i}\n{_workshop_info(workshop)}" for i, workshop in enumerate(workshops, 1)
+        )
+        return self._chat_details(user_prompt, max_tokens=1000 * len(workshops))
+    
+    def _parse_enhancement(self, workshop_data: Dict[str, Any], enhancement_result: str) -> Dict[str, Any]:
+        """Turn the chat response text for one workshop into the enhanced workshop document"""
+        
+        # Log the LLM response for debugging
+        logger.info(f"LLM Enhancement Response for workshop {workshop_data.get('workshop_id', 'unknown')}:")
+        logger.info(f"Response: {enhancement_result[:500]}...")  # Log first 500 chars
+        
+        # Parse the enhancement result
+        try:
+            enhancement_data = _loads(_extract_json(enhancement_result))
+            _enhance_cache().set(_content_key(workshop_data, self.model_id), enhancement_data)
+            enhanced_workshop = self._build_enhanced_workshop(workshop_data, enhancement_data)
+            logger.info(f"Enhanced workshop: {workshop_data.get('workshop_id', 'unknown')}")
+            return enhanced_workshop
+            
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse enhancement result: {e}")
+            # Return original data with basic enhancement
+            return self._create_basic_enhancement(workshop_data)
+    
+    def _build_enhanced_workshop(self, workshop_data: Dict[str, Any], enhancement_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create enhanced workshop document"""
+        document_id = self._document_id(workshop_data)
+        return {
+            '_id': document_id,
+            'id': document_id,
+            'title': workshop_data.get('title', ''),
+            'description': workshop_data.get('description', ''),
+            'text_content': workshop_data.get('text_content', ''),
+            'keywords': enhancement_data.get('keywords', []),
+            'author': enhancement_data.get('author', 'Oracle'),
+            'created_at': self.created_at,
+            'difficulty': enhancement_data.get('difficulty', 'INTERMEDIATE'),
+            'category': enhancement_data.get('category', 'General'),
+            'duration_estimate': enhancement_data.get('duration_estimate', 'Unknown'),
+            'resource_type': enhancement_data.get('resource_type', 'WORKSHOP'),
+            'source': enhancement_data.get('source', 'Oracle LiveLabs'),
+            'url': workshop_data.get('url', ''),
+            'language': enhancement_data.get('language', 'ko')
+        }
+    
+    def _document_id(self, workshop_data: Dict[str, Any]) -> str:
+        """_id (and id) of the enhanced document: the workshop ID, or a unique run-prefixed ID when it is missing"""
+        workshop_id = workshop_data.get('workshop_id')
+        if workshop_id is not None:
+            return workshop_id
+        return self._fallback_id_prefix + uuid.uuid4().hex[:8]
+    
+    def _cached_enhancement(self, workshop_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Enhanced document rebuilt from a cached enhancement result, or None on a cache miss"""
+        enhancement_data = _enhance_cache().get(_content_key(workshop_data, self.model_id))
+        if enhancement_data is None:
+            return None
+        logger.info(f"Enhancement cache hit: {workshop_data.get('workshop_id', 'unknown')}")
+        return self._build_enhanced_workshop(workshop_data, enhancement_data)
+    
     def enhance_workshop(self, workshop_data: Dict[str, Any]) -> Dict[str, Any]:
         """Enhance workshop data using OCI GenAI"""
         
+        cached = self._cached_enhancement(workshop_data)
+        if cached is not None:
+            return cached
+        
         if not self.client:
             logger.error("OCI client not initialized")
             return workshop_data
         
         try:
-            # Prepare workshop information for AI analysis
-            workshop_info = f"""
-            제목: {workshop_data.get('title', 'N/A')}
-            설명: {workshop_data.get('description', 'N/A')}
-            텍스트 내용: {workshop_data.get('text_content', '')[:2000]}  # Limit text for prompt
-            URL: {workshop_data.get('url', 'N/A')}
-            """
-            
-            enhancement_prompt = f"""
-            다음 워크샵 정보를 분석하고 향상된 형태로 변환해주세요:
-
-            {workshop_info}
-
-            다음 JSON 형식으로 응답해주세요:
-            {{
-                "keywords": ["주요 키워드들"],
-                "author": "작성자 또는 기관명",
-                "difficulty": "BEGINNER|INTERMEDIATE|ADVANCED",
-                "category": "주요 카테고리",
-                "duration_estimate": "예상 소요 시간",
-                "resource_type": "WORKSHOP|TUTORIAL|GUIDE|DEMO",
-                "source": "Oracle LiveLabs",
-                "language": "ko|en"
-            }}
-
-            분석 기준:
-            - keywords: 워크샵 내용에서 추출한 주요 기술 키워드들
-            - author: Oracle 또는 관련 기관명
-            - difficulty: 내용의 복잡도에 따라 판단
-            - category: 주요 기술 영역 (예: OCI, Database, Security, etc.)
-            - duration_estimate: 워크샵 제목이나 내용에서 추정
-            - resource_type: 워크샵 형태에 따라 판단
-            - language: 한국어/영어 등 언어 구분
-            """
-            
-            content = genai_models.TextContent(text=enhancement_prompt, type="TEXT")
-            message = genai_models.Message(role="USER", content=[content])
-            
-            chat_request = genai_models.GenericChatRequest(
-                api_format=genai_models.BaseChatRequest.API_FORMAT_GENERIC,
-                messages=[message],
-                max_tokens=1000,
-                temperature=0.3
-            )
-            
-            chat_details = genai_models.ChatDetails(
-                serving_mode=genai_models.OnDemandServingMode(model_id=self.model_id),
-                chat_request=chat_request,
-                compartment_id=self.compartment_id
-            )
-            
-            response = self.client.chat(chat_details)
-            enhancement_result = response.data.chat_response.choices[0].message.content[0].text.strip()
-            
-            # Log the LLM response for debugging
-            logger.info(f"LLM Enhancement Response for workshop {workshop_data.get('workshop_id', 'unknown')}:")
-            logger.info(f"Response: {enhancement_result[:500]}...")  # Log first 500 chars
-            
-            # Parse the enhancement result
-            try:
-                # Extract JSON from response
-                if "```json" in enhancement_result:
-                    json_start = enhancement_result.find("```json") + 7
-                    json_end = enhancement_result.find("```", json_start)
-                    json_str = enhancement_result[json_start:json_end].strip()
-                else:
-                    start = enhancement_result.find("{")
-                    end = enhancement_result.rfind("}") + 1
-                    json_str = enhancement_result[start:end]
-                
-                enhancement_data = json.loads(json_str)
-                
-                # Create enhanced workshop document
-                enhanced_workshop = {
-                    '_id': workshop_data.get('workshop_id', f"workshop_{datetime.now().strftime('%Y%m%d_%H%M%S')}"),
-                    'id': workshop_data.get('workshop_id', 'unknown'),
-                    'title': workshop_data.get('title', ''),
-                    'description': workshop_data.get('description', ''),
-                    'text_content': workshop_data.get('text_content', ''),
-                    'keywords': enhancement_data.get('keywords', []),
-                    'author': enhancement_data.get('author', 'Oracle'),
-                    'created_at': datetime.now().strftime('%Y-%m-%d'),
-                    'difficulty': enhancement_data.get('difficulty', 'INTERMEDIATE'),
-                    'category': enhancement_data.get('category', 'General'),
-                    'duration_estimate': enhancement_data.get('duration_estimate', 'Unknown'),
-                    'resource_type': enhancement_data.get('resource_type', 'WORKSHOP'),
-                    'source': enhancement_data.get('source', 'Oracle LiveLabs'),
-                    'url': workshop_data.get('url', ''),
-                    'language': enhancement_data.get('language', 'ko')
-                }
+            enhancement_result = self._chat_text(self._build_chat_details(workshop_data))
+            return self._parse_enhancement(workshop_data, enhancement_result)
                 
-                logger.info(f"Enhanced workshop: {workshop_data.get('workshop_id', 'unknown')}")
-                return enhanced_workshop
-                
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse enhancement result: {e}")
-                # Return original data with basic enhancement
-                return self._create_basic_enhancement(workshop_data)
+        except Exception as e:
+            logger.error(f"Error enhancing workshop: {e}")
+            return self._create_basic_enhancement(workshop_data)
+    
+    async def aenhance_workshop(self, workshop_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Async enhance_workshop: the OCI SDK is synchronous, so the chat call runs in a worker thread"""
+        
+        cached = self._cached_enhancement(workshop_data)
+        if cached is not None:
+            return cached
+        
+        if not self.client:
+            logger.error("OCI client not initialized")
+            return workshop_data
+        
+        try:
+            chat_details = self._build_chat_details(workshop_data)
+            enhancement_result = await asyncio.get_running_loop().run_in_executor(None, self._chat_text, chat_details)
+            return self._parse_enhancement(workshop_data, enhancement_result)
                 
         except Exception as e:
             logger.error(f"Error enhancing workshop: {e}")
             return self._create_basic_enhancement(workshop_data)
     
+    def _parse_batch_enhancement(self, workshops: List[Dict[str, Any]], enhancement_result: str) -> List[Dict[str, Any]]:
+        """Split a batched response into one enhanced document per workshop (mapped back by index).
+        Raises ValueError when the response is not a JSON results array of the right length."""
+        logger.info(f"LLM Batch Enhancement Response for {len(workshops)} workshops: {enhancement_result[:500]}...")
+        
+        results = _loads(_extract_json(enhancement_result)).get("results")
+        if not isinstance(results, list) or len(results) != len(workshops):
+            raise ValueError(f"expected {len(workshops)} results, got {len(results) if isinstance(results, list) else 'none'}")
+        
+        cache = _enhance_cache()
+        for workshop, enhancement in zip(workshops, results):
+            if isinstance(enhancement, dict):
+                cache.set(_content_key(workshop, self.model_id), enhancement)
+        
+        return [
+            self._build_enhanced_workshop(workshop, enhancement if isinstance(enhancement, dict) else {})
+            for workshop, enhancement in zip(workshops, results)
+        ]
+    
+    @staticmethod
+    def _merge_cached(cached: List[Optional[Dict[str, Any]]], enhanced: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Fill the cache misses (None) in input order with the freshly enhanced documents"""
+        fresh = iter(enhanced)
+        return [hit if hit is not None else next(fresh) for hit in cached]
+    
+    def enhance_workshops_batch(self, workshops: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Enhance several workshops with a single chat request; falls back to per-workshop calls
+        for this batch when the batched response cannot be used. Cached workshops are not sent again."""
+        cached = [self._cached_enhancement(workshop) for workshop in workshops]
+        misses = [workshop for workshop, hit in zip(workshops, cached) if hit is None]
+        if len(misses) <= 1 or not self.client:
+            return self._merge_cached(cached, [self.enhance_workshop(workshop) for workshop in misses])
+        
+        try:
+            enhancement_result = self._chat_text(self._build_batch_chat_details(misses))
+            enhanced = self._parse_batch_enhancement(misses, enhancement_result)
+        except Exception as e:
+            logger.warning(f"Batch enhancement failed ({e}), falling back to per-workshop calls")
+            enhanced = [self.enhance_workshop(workshop) for workshop in misses]
+        return self._merge_cached(cached, enhanced)
+    
+    async def aenhance_workshops_batch(self, workshops: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Async enhance_workshops_batch"""
+        cached = [self._cached_enhancement(workshop) for workshop in workshops]
+        misses = [workshop for workshop, hit in zip(workshops, cached) if hit is None]
+        if len(misses) <= 1 or not self.client:
+            enhanced = await asyncio.gather(*(self.aenhance_workshop(workshop) for workshop in misses))
+            return self._merge_cached(cached, list(enhanced))
+        
+        try:
+            chat_details = self._build_batch_chat_details(misses)
+            enhancement_result = await asyncio.get_running_loop().run_in_executor(None, self._chat_text, chat_details)
+            enhanced = self._parse_batch_enhancement(misses, enhancement_result)
+        except Exception as e:
+            logger.warning(f"Batch enhancement failed ({e}), falling back to per-workshop calls")
+            enhanced = list(await asyncio.gather(*(self.aenhance_workshop(workshop) for workshop in misses)))
+        return self._merge_cached(cached, enhanced)
+    
     def _create_basic_enhancement(self, workshop_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create basic enhancement when AI enhancement fails"""
+        document_id = self._document_id(workshop_data)
         return {
-            '_id': workshop_data.get('workshop_id', f"workshop_{datetime.now().strftime('%Y%m%d_%H%M%S')}"),
-            'id': workshop_data.get('workshop_id', 'unknown'),
+            '_id': document_id,
+            'id': document_id,
             'title': workshop_data.get('title', ''),
             'description': workshop_data.get('description', ''),
             'text_content': workshop_data.get('text_content', ''),
             'keywords': ['Oracle', 'LiveLabs'],
             'author': 'Oracle',
-            'created_at': datetime.now().strftime('%Y-%m-%d'),
+            'created_at': self.created_at,
             'difficulty': 'INTERMEDIATE',
             'category': 'General',
             'duration_estimate': 'Unknown',
@@ -213,131 +446,168 @@ class WorkshopAIEnhancer:
             'language': 'ko'
         }
 
-def import_raw_workshop_texts(json_filename="workshop_texts_progress.json", collection_name="workshop_texts"):
-    """Import raw workshop text data from JSON file to MongoDB without enhancement"""
-    # Load workshop texts from JSON
+def _iter_successful_workshops(json_filename):
+    """Stream the successful workshop entries of a progress JSON file (workshops[*] with success=True)
+    without loading the whole file into memory."""
+    with open(json_filename, "rb") as f:
+        for workshop in ijson.items(f, "workshops.item", use_float=True):
+            if workshop.get("success"):
+                yield workshop
+
+def load_successful_workshops(json_filename="workshop_texts_progress.json"):
+    """Parse the progress file once; returns the successful workshops, or None if the file cannot be read"""
     try:
-        with open(json_filename, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            workshops = data.get("workshops", [])
+        return list(_iter_successful_workshops(json_filename))
     except Exception as e:
         logger.error(f"Failed to load {json_filename}: {e}")
-        return False
+        return None
 
-    if not workshops:
-        logger.error(f"No workshop texts found in {json_filename}")
-        return False
+def import_raw_workshop_texts(json_filename="workshop_texts_progress.json", collection_name="workshop_texts", workshops=None):
+    """Import raw workshop text data from JSON file to MongoDB without enhancement.
+    workshops: already loaded successful workshops (skips reading json_filename); by default the
+    file is streamed and inserted INSERT_BATCH_SIZE documents at a time."""
+    source = workshops if workshops is not None else _iter_successful_workshops(json_filename)
 
     # Create MongoDB manager
     mongo_manager = MongoManager(collection_name=collection_name)
 
-    # Insert only successful workshop texts
-    successful_workshops = [w for w in workshops if w.get("success")]
-    logger.info(f"Importing {len(successful_workshops)} successful workshop texts to MongoDB...")
+    # Insert only successful workshop texts, one chunk at a time
+    logger.info("Importing successful workshop texts to MongoDB...")
+    imported = 0
+    success = True
+    try:
+        source = iter(source)
+        for chunk in iter(lambda: list(islice(source, INSERT_BATCH_SIZE)), []):
+            success = mongo_manager.insert_workshops(chunk) and success
+            imported += len(chunk)
+    except Exception as e:
+        logger.error(f"Failed to load {json_filename}: {e}")
+        success = False
 
-    success = mongo_manager.insert_workshops(successful_workshops)
-    if success:
-        logger.info(f"Successfully imported {len(successful_workshops)} workshop texts to MongoDB")
+    if not imported:
+        logger.error(f"No workshop texts found in {json_filename}")
+        success = False
+    elif success:
+        logger.info(f"Successfully imported {imported} workshop texts to MongoDB")
     else:
         logger.error("Failed to import workshop texts to MongoDB")
 
     mongo_manager.close()
     return success
 
-def import_ai_enhanced_workshops(json_filename="workshop_texts_progress.json", collection_name="livelabs_workshops_json2"):
-    """Import AI-enhanced workshop data to MongoDB with metadata extraction and categorization"""
-    # Load workshop texts from JSON
-    try:
-        with open(json_filename, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            workshops = data.get("workshops", [])
-    except Exception as e:
-        logger.error(f"Failed to load {json_filename}: {e}")
+def import_ai_enhanced_workshops(json_filename="workshop_texts_progress.json", collection_name="livelabs_workshops_json2", workshops=None):
+    """Import AI-enhanced workshop data to MongoDB with metadata extraction and categorization.
+    workshops: already loaded successful workshops (skips reading json_filename)"""
+    # Load successful workshop texts (length binning needs them all up front)
+    successful_workshops = workshops if workshops is not None else load_successful_workshops(json_filename)
+    if successful_workshops is None:
         return False
 
-    if not workshops:
+    if not successful_workshops:
         logger.error(f"No workshop texts found in {json_filename}")
         return False
 
     # Create MongoDB manager for enhanced collection
     mongo_manager = MongoManager(collection_name=collection_name)
+    # Re-inserted workshops are rejected per document instead of duplicating (index built once, before bulk writes)
+    mongo_manager.ensure_unique_index('id')
     
     # Create AI enhancer
     enhancer = WorkshopAIEnhancer()
 
-    # Process only successful workshop texts
-    successful_workshops = [w for w in workshops if w.get("success")]
     logger.info(f"Enhancing and importing {len(successful_workshops)} workshop texts to MongoDB...")
 
-    # Load progress from file if exists
-    progress_file = "enhancement_progress.json"
-    processed_ids = set()
-    
-    try:
-        if os.path.exists(progress_file):
-            with open(progress_file, "r") as f:
-                progress_data = json.load(f)
-                processed_ids = set(progress_data.get("processed_ids", []))
-                logger.info(f"📋 Resuming from progress file. Already processed: {len(processed_ids)} workshops")
-    except Exception as e:
-        logger.warning(f"Could not load progress file: {e}")
+    # The target collection is the checkpoint: every committed workshop is already there under its _id
+    processed_ids = _load_processed_ids(mongo_manager)
+    if processed_ids:
+        logger.info(f"📋 Resuming from {collection_name}. Already processed: {len(processed_ids)} workshops")
 
-    # Track progress
-    processed_count = len(processed_ids)
-    failed_count = 0
+    pending = [w for w in successful_workshops if w.get('workshop_id', 'unknown') not in processed_ids]
+    skipped = len(successful_workshops) - len(pending)
+    if skipped:
+        logger.info(f"⏭️  Skipping {skipped} already processed workshops")
     
-    for i, workshop in enumerate(successful_workshops, 1):
-        workshop_id = workshop.get('workshop_id', 'unknown')
-        
-        # Skip if already processed
-        if workshop_id in processed_ids:
-            logger.info(f"⏭️  Skipping already processed workshop {workshop_id}")
-            continue
-            
-        logger.info(f"Processing workshop {i}/{len(successful_workshops)}: {workshop_id}")
-        
-        try:
-            # Enhance workshop using AI
-            enhanced_workshop = enhancer.enhance_workshop(workshop)
-            
-            # Insert single workshop immediately
-            success = mongo_manager.insert_single_workshop(enhanced_workshop)
-            
-            if success:
-                processed_count += 1
-                processed_ids.add(workshop_id)
-                logger.info(f"✅ Successfully processed and committed workshop {workshop_id} ({processed_count}/{len(successful_workshops)})")
-                
-                # Save progress every 10 workshops
-                if processed_count % 10 == 0:
-                    with open(progress_file, "w") as f:
-                        json.dump({
-                            "processed_ids": list(processed_ids),
-                            "total_processed": processed_count,
-                            "last_updated": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                        }, f, indent=2)
-                    logger.info(f"💾 Progress saved: {processed_count} workshops processed")
-            else:
-                failed_count += 1
-                logger.error(f"❌ Failed to commit workshop {workshop_id}")
-                
-        except Exception as e:
-            failed_count += 1
-            logger.error(f"❌ Error processing workshop {workshop_id}: {e}")
-            continue
-
-    # Save final progress
-    with open(progress_file, "w") as f:
-        json.dump({
-            "processed_ids": list(processed_ids),
-            "total_processed": processed_count,
-            "last_updated": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        }, f, indent=2)
+    processed_count, failed_count = asyncio.run(_enhance_and_insert_all(
+        enhancer, mongo_manager, pending, len(successful_workshops), processed_ids
+    ))
 
     logger.info(f"🎉 Processing complete! Successfully processed: {processed_count}, Failed: {failed_count}")
     mongo_manager.close()
     return processed_count > 0
 
+def _load_processed_ids(mongo_manager):
+    """Workshop IDs already committed to the enhanced collection (enhanced documents use the workshop ID as _id)"""
+    try:
+        return set(mongo_manager.collection.distinct('_id'))
+    except Exception as e:
+        logger.warning(f"Could not load processed workshop IDs: {e}")
+        return set()
+
+def _length_binned_batches(workshops, batch_size):
+    """
+    Group workshops into LENGTH_BINS bins by text_content length (500-char steps, last bin open-ended)
+    and cut fixed-size batches inside each bin, so a batched prompt never mixes very short and very
+    long workshops and the slowest item does not stall the whole request.
+    """
+    bins = defaultdict(list)
+    for workshop in workshops:
+        bins[min(len(workshop.get('text_content') or '') // 500, LENGTH_BINS - 1)].append(workshop)
+    
+    for length_bin in sorted(bins):
+        members = iter(bins[length_bin])
+        yield from iter(lambda: list(islice(members, batch_size)), [])
+
+async def _enhance_and_insert_all(enhancer, mongo_manager, pending, total, processed_ids):
+    """Enhance workshops ENHANCE_BATCH_SIZE per chat request, with at most ENHANCE_CONCURRENCY requests
+    in flight, and insert them in MONGO_BATCH_SIZE batches. Returns (processed_count, failed_count); processed_ids is
+    updated in place, only for workshops whose batch was actually written."""
+    semaphore = asyncio.Semaphore(ENHANCE_CONCURRENCY)
+    buffer_lock = asyncio.Lock()
+    loop = asyncio.get_running_loop()
+    # Blocking OCI/Mongo calls run in this pool; size it so the semaphore (not the pool) is the limit
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=ENHANCE_CONCURRENCY))
+    counts = {"processed": len(processed_ids), "failed": 0}
+    batch_buffer = []
+    
+    def flush(batch):
+        """Insert one batch and count the committed workshops (runs in a worker thread)"""
+        committed = mongo_manager.insert_many_workshops(batch)
+        committed_ids = {doc.get('id', doc.get('workshop_id', 'unknown')) for doc in committed}
+        processed_ids.update(committed_ids)
+        counts["processed"] += len(committed_ids)
+        counts["failed"] += len(batch) - len(committed)
+        logger.info(f"💾 Committed {len(committed)}/{len(batch)} workshops ({counts['processed']}/{total})")
+    
+    async def process(batch):
+        batch_ids = [workshop.get('workshop_id', 'unknown') for workshop in batch]
+        async with semaphore:
+            logger.info(f"Processing workshops {batch_ids}")
+            try:
+                # Enhance ENHANCE_BATCH_SIZE workshops with one AI request
+                enhanced_workshops = await enhancer.aenhance_workshops_batch(batch)
+            except Exception as e:
+                counts["failed"] += len(batch)
+                logger.error(f"❌ Error processing workshops {batch_ids}: {e}")
+                return
+        
+        async with buffer_lock:
+            batch_buffer.extend(enhanced_workshops)
+            if len(batch_buffer) < MONGO_BATCH_SIZE:
+                return
+            to_insert = batch_buffer[:]
+            batch_buffer.clear()
+            # Flush under the lock so the counters are updated by one batch at a time
+            await loop.run_in_executor(None, flush, to_insert)
+    
+    try:
+        await asyncio.gather(*(process(batch) for batch in _length_binned_batches(pending, ENHANCE_BATCH_SIZE)))
+    finally:
+        # Write whatever is left, also when interrupted
+        if batch_buffer:
+            flush(batch_buffer[:])
+            batch_buffer.clear()
+    return counts["processed"], counts["failed"]
+
 def test_ai_enhancement():
     """Test AI enhancement capabilities with a sample workshop"""
     print("🧪 Testing LLM enhancement...")
@@ -379,13 +649,19 @@ def main():
             print("❌ Failed to import workshop texts to MongoDB")
         return
     
+    # Parse the progress file once and share it between both imports
+    workshops = load_successful_workshops()
+    if workshops is None:
+        print("❌ Workshop AI enhancement pipeline failed")
+        return
+    
     # Import original workshop texts
     print("\n📥 Importing raw workshop texts...")
-    success1 = import_raw_workshop_texts()
+    success1 = import_raw_workshop_texts(workshops=workshops)
     
     # Import AI-enhanced workshop texts
     print("\n🤖 Importing AI-enhanced workshop data...")
-    success2 = import_ai_enhanced_workshops()
+    success2 = import_ai_enhanced_workshops(workshops=workshops)
     
     if success1 and success2:
         print("✅ Workshop AI enhancement pipeline completed successfully")
@@ -10,15 +10,18 @@ Oracle LiveLabs Workshop Text Scraper
 Goes to a specific workshop, clicks start and run buttons, extracts all visible text, saves to JSON.
 """
 
-import json
-import time
+import os
+import orjson
 import logging
+import threading
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import TimeoutException
 import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -28,29 +31,102 @@ BASE_URL = "https://apexapps.oracle.com"
 WORKSHOP_PATH = "/pls/apex/r/dbpm/livelabs/view-workshop?wid=648&clear=RR,180&session=112872587055069"
 FULL_URL = BASE_URL + WORKSHOP_PATH
 
+# 텍스트 추출에 필요 없는 리소스 (images, fonts, analytics) - CDP로 요청 자체를 차단
+BLOCKED_URL_PATTERNS = ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.svg', '*.webp', '*.woff', '*.woff2', '*.ttf', '*analytics*']
+
+OVERLAY_SELECTOR = 'div.truste_overlay, div[id^="pop-div"]'
+OVERLAY_WAIT = 2
+TOGGLE_WAIT = 2
+CONTENT_READY_JS = "return !!document.querySelector('.hol-Content, #contentBox') || document.querySelectorAll('iframe').length > 0"
+
+# 메인 페이지와 same-origin frame 전체를 한 번의 execute_script로 탐색 (selector 우선순위 유지)
+# cross-origin frame은 접근 시 예외 -> 건너뛰고, 기존 frame 전환 루프가 처리
+FRAME_SCAN_JS = """
+const sels = ['.hol-Content', '#contentBox'];
+function scan(win, sel) {
+    try {
+        const el = win.document.querySelector(sel);
+        if (el && el.innerText.trim()) return el.innerText;
+        for (const f of win.frames) { const t = scan(f, sel); if (t) return t; }
+    } catch (e) {}
+    return '';
+}
+for (const s of sels) { const t = scan(window, s); if (t) return t; }
+return '';
+"""
+
+# scrape_many 에서 동시에 띄우는 Chrome 수 (each worker drives its own browser)
+SCRAPE_WORKERS = 6
+
 class LiveLabsWorkshopTextScraper:
-    def __init__(self):
+    def __init__(self, url=FULL_URL, headless=False):
+        self.url = url
+        self.headless = headless
         self.driver = None
         self.text_content = ""
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+        return False
+
+    def reset_state(self, url=None):
+        """Prepare for the next workshop on the same browser session (cookies/overlay consent are kept)"""
+        if url:
+            self.url = url
+        self.text_content = ""
+        if self.driver:
+            self.driver.switch_to.default_content()
+
+    def close(self):
+        """Quit the browser"""
+        if self.driver:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                logger.warning(f"Error quitting driver: {e}")
+            self.driver = None
+
     def setup_driver(self):
         chrome_options = Options()
-        # chrome_options.add_argument("--headless")  # Uncomment for headless
+        if self.headless:
+            chrome_options.add_argument("--headless=new")
+            # Skip image decoding so more parallel workers fit in RAM/CPU
+            chrome_options.add_argument("--blink-settings=imagesEnabled=false")
         chrome_options.add_argument("--no-sandbox")
         chrome_options.add_argument("--disable-dev-shm-usage")
         chrome_options.add_argument("--disable-gpu")
         chrome_options.add_argument("--window-size=1920,1080")
         chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+        # Only the workshop text is needed: skip images/fonts and return at DOMContentLoaded
+        chrome_options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.managed_default_content_settings.fonts": 2
+        })
+        chrome_options.page_load_strategy = 'eager'
         self.driver = webdriver.Chrome(options=chrome_options)
         self.driver.implicitly_wait(10)
+        try:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+        except Exception as e:
+            logger.warning(f"Could not block static resources via CDP: {e}")
 
     def close_overlay_if_present(self):
         """Try to close or remove the cookie/privacy overlay if present."""
         try:
-            # Wait briefly for overlay to appear
-            time.sleep(2)
+            # Wait (at most OVERLAY_WAIT seconds) for the overlay to appear; a timeout means no overlay
+            # JS check instead of find_element so the 10s implicit wait does not apply
+            try:
+                WebDriverWait(self.driver, OVERLAY_WAIT).until(
+                    lambda d: d.execute_script("return document.querySelector(arguments[0]) !== null", OVERLAY_SELECTOR)
+                )
+            except TimeoutException:
+                return
             # Try to find the overlay by id or class
-            overlays = self.driver.find_elements(By.CSS_SELECTOR, 'div.truste_overlay, div[id^="pop-div"]')
+            overlays = self.driver.find_elements(By.CSS_SELECTOR, OVERLAY_SELECTOR)
             if overlays:
                 logger.info("Overlay detected. Attempting to close or remove it...")
                 # Try to find a close/accept button inside the overlay
@@ -60,7 +136,11 @@ class LiveLabsWorkshopTextScraper:
                         close_btn = overlay.find_element(By.CSS_SELECTOR, '.close, .accept, button, .truste_btn_accept')
                         close_btn.click()
                         logger.info("Overlay closed by clicking button.")
-                        time.sleep(1)
+                        # Continue as soon as the overlay is gone instead of a fixed pause
+                        try:
+                            WebDriverWait(self.driver, OVERLAY_WAIT).until(EC.staleness_of(overlay))
+                        except TimeoutException:
+                            pass
                         return
                     except Exception:
                         pass
@@ -68,7 +148,6 @@ class LiveLabsWorkshopTextScraper:
                 for overlay in overlays:
                     self.driver.execute_script("arguments[0].parentNode.removeChild(arguments[0]);", overlay)
                 logger.info("Overlay removed with JavaScript.")
-                time.sleep(1)
         except Exception as e:
             logger.warning(f"No overlay to close or error closing overlay: {e}")
 
@@ -77,12 +156,17 @@ class LiveLabsWorkshopTextScraper:
         try:
             from selenium.common.exceptions import ElementClickInterceptedException, ElementNotInteractableException
             import selenium.common.exceptions
-            import time
             btn = self.driver.find_element(By.ID, "btn_toggle")
             if btn.is_displayed() and btn.is_enabled():
                 print("Clicking #btn_toggle button...")
                 btn.click()
-                time.sleep(1)
+                # Wait for the toggled content to show up in this frame rather than sleeping
+                try:
+                    WebDriverWait(self.driver, TOGGLE_WAIT).until(
+                        lambda d: d.execute_script("return !!document.querySelector('.hol-Content, #contentBox')")
+                    )
+                except TimeoutException:
+                    pass
                 return True
         except (selenium.common.exceptions.NoSuchElementException, ElementClickInterceptedException, ElementNotInteractableException):
             print("#btn_toggle button not found or not clickable in this frame.")
@@ -91,11 +175,13 @@ class LiveLabsWorkshopTextScraper:
         return False
 
     def scrape_workshop(self):
+        """Scrape self.url; the browser is started on first use and kept for later workshops (call close())"""
         try:
-            self.setup_driver()
-            logger.info(f"Navigating to: {FULL_URL}")
-            print(f"Navigating to: {FULL_URL}")
-            self.driver.get(FULL_URL)
+            if self.driver is None:
+                self.setup_driver()
+            logger.info(f"Navigating to: {self.url}")
+            print(f"Navigating to: {self.url}")
+            self.driver.get(self.url)
             self.close_overlay_if_present()
             logger.info("Waiting for start button...")
             print("Waiting for start button...")
@@ -105,7 +191,6 @@ class LiveLabsWorkshopTextScraper:
             logger.info("Clicking start button...")
             print("Clicking start button...")
             self.driver.find_element(By.ID, "start-button-id").click()
-            time.sleep(2)
             logger.info("Waiting for 'Run on Your Tenancy' button...")
             print("Waiting for 'Run on Your Tenancy' button...")
             WebDriverWait(self.driver, 20).until(
@@ -114,21 +199,23 @@ class LiveLabsWorkshopTextScraper:
             logger.info("Clicking 'Run on Your Tenancy' button...")
             print("Clicking 'Run on Your Tenancy' button...")
             self.driver.find_element(By.ID, "runOnYourTenancy").click()
-            time.sleep(3)
-            # Try to find .hol-Content in main page first
-            print("Trying to find .hol-Content in main page...")
+            # Proceed as soon as the workshop content (or its iframes) is in the DOM
+            try:
+                WebDriverWait(self.driver, 20).until(lambda d: d.execute_script(CONTENT_READY_JS))
+            except TimeoutException:
+                logger.warning("Workshop content not detected after 20s, searching anyway")
+            # One script walks the main page and every same-origin frame (.hol-Content first, then #contentBox)
+            print("Scanning main page and frames for .hol-Content / #contentBox...")
             try:
                 self.try_click_btn_toggle()
-                self.text_content = self.driver.execute_script(
-                    "return document.querySelector('.hol-Content') ? document.querySelector('.hol-Content').innerText : ''"
-                )
+                self.text_content = self.driver.execute_script(FRAME_SCAN_JS)
                 if self.text_content.strip():
-                    print(f"Found .hol-Content in main page, length: {len(self.text_content)}")
-                    logger.info(f"Extracted {len(self.text_content)} characters of text from .hol-Content (main page).")
+                    print(f"Found workshop content via frame scan, length: {len(self.text_content)}")
+                    logger.info(f"Extracted {len(self.text_content)} characters of text (single frame scan).")
                     return
             except Exception as e:
-                print(f"Not found in main page: {e}")
-            # If not found, search all iframes
+                print(f"Frame scan failed: {e}")
+            # If not found, fall back to switching into each iframe (cross-origin frames, or content behind #btn_toggle)
             print("Searching all iframes for .hol-Content...")
             iframes = self.driver.find_elements(By.TAG_NAME, "iframe")
             print(f"Found {len(iframes)} iframes.")
@@ -189,25 +276,97 @@ class LiveLabsWorkshopTextScraper:
             logger.error(f"Error during scraping: {e}")
             print(f"Error during scraping: {e}")
             traceback.print_exc()
-        finally:
-            if self.driver:
-                self.driver.quit()
+            # The session may be broken; start a fresh browser for the next workshop
+            self.close()
 
     def save_to_json(self, filename="workshop_text.json"):
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump({
-                    "url": FULL_URL,
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps({
+                    "url": self.url,
                     "text": self.text_content
-                }, f, indent=2, ensure_ascii=False)
+                }, option=orjson.OPT_INDENT_2))
             logger.info(f"Workshop text saved to {filename}")
         except Exception as e:
             logger.error(f"Error saving to JSON: {e}")
 
+def load_progress(progress_file):
+    """Results recorded in a scrape_many progress file (JSONL, one result per line)"""
+    results = []
+    if os.path.exists(progress_file):
+        with open(progress_file, "rb") as f:
+            for line in f:
+                if line.strip():
+                    results.append(orjson.loads(line))
+    return results
+
+def _write_progress_meta(progress_file, counts):
+    """Small counters sidecar (<progress_file>.meta.json), replaced atomically"""
+    meta_file = os.path.splitext(progress_file)[0] + ".meta.json"
+    tmp_file = meta_file + ".tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(orjson.dumps(counts))
+    os.replace(tmp_file, meta_file)
+
+def scrape_many(urls, workers=SCRAPE_WORKERS, progress_file=None):
+    """Scrape several workshops concurrently, one Chrome driver per worker thread.
+    Each worker keeps its browser session for all the workshops it handles.
+    Results are returned in completion order.
+    progress_file: JSONL file each result is appended to as soon as it completes; URLs already
+    scraped successfully in it are skipped, so an interrupted run can be resumed."""
+    local = threading.local()
+    scrapers = []
+    scrapers_lock = threading.Lock()
+
+    def scrape_one(url):
+        scraper = getattr(local, "scraper", None)
+        if scraper is None:
+            scraper = local.scraper = LiveLabsWorkshopTextScraper(url, headless=True)
+            with scrapers_lock:
+                scrapers.append(scraper)
+        scraper.reset_state(url)
+        scraper.scrape_workshop()
+        return {"url": url, "text": scraper.text_content, "success": bool(scraper.text_content.strip())}
+
+    done = {}
+    if progress_file:
+        done = {result["url"]: result for result in load_progress(progress_file) if result.get("success")}
+        if done:
+            logger.info(f"Resuming from {progress_file}: {len(done)} workshops already scraped")
+    pending = [url for url in urls if url not in done]
+
+    results = [done[url] for url in urls if url in done]
+    counts = {"total": len(urls), "succeeded": len(results), "failed": 0}
+    progress_fp = open(progress_file, "ab") if progress_file else None
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(scrape_one, url): url for url in pending}
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Error scraping {url}: {e}")
+                    result = {"url": url, "text": "", "success": False}
+                results.append(result)
+                counts["succeeded" if result["success"] else "failed"] += 1
+                if progress_fp:
+                    # One appended line per workshop instead of rewriting everything scraped so far
+                    progress_fp.write(orjson.dumps(result) + b"\n")
+                    progress_fp.flush()
+                    _write_progress_meta(progress_file, counts)
+                logger.info(f"Scraped {len(results)}/{len(urls)} workshops")
+    finally:
+        if progress_fp:
+            progress_fp.close()
+        for scraper in scrapers:
+            scraper.close()
+    return results
+
 def main():
-    scraper = LiveLabsWorkshopTextScraper()
-    scraper.scrape_workshop()
-    scraper.save_to_json()
+    with LiveLabsWorkshopTextScraper() as scraper:
+        scraper.scrape_workshop()
+        scraper.save_to_json()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
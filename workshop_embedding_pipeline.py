@@ -9,7 +9,7 @@ MongoDB에서 워크샵 데이터를 추출하여 OCI(Oracle Cloud Infrastructur
 
 ### 주요 기능:
 - **데이터 추출**: MongoDB의 워크샵 컬렉션에서 구조화된 데이터 추출
-- **텍스트 전처리**: 전체 JSON 문서를 임베딩 생성에 최적화된 텍스트로 변환
+- **텍스트 전처리**: 검색에 필요한 필드만 골라 임베딩용 텍스트로 변환
 - **벡터 임베딩 생성**: OCI Cohere 모델을 사용하여 고품질 의미론적 임베딩 생성
 - **벡터 데이터베이스 저장**: Oracle Database의 벡터 검색 기능을 위한 임베딩 저장
 - **배치 처리**: 대량의 워크샵 데이터를 효율적으로 처리하며 진행상황 모니터링
@@ -17,7 +17,7 @@ MongoDB에서 워크샵 데이터를 추출하여 OCI(Oracle Cloud Infrastructur
 
 ### 데이터 플로우:
 1. **MongoDB** → 워크샵 메타데이터 및 콘텐츠 추출
-2. **OCI GenAI** → JSON 문서 전체를 벡터로 변환
+2. **OCI GenAI** → 워크샵 텍스트를 벡터로 변환
 3. **Oracle Vector DB** → 의미론적 검색을 위한 벡터 저장
 
 ### 사용 사례:
@@ -29,15 +29,21 @@ ETL pipeline that processes workshop data: MongoDB → OCI Embeddings → Oracle
 Generates semantic embeddings for workshop content to enable vector-based search
 """
 
+import asyncio
+import hashlib
 import logging
 import os
-import json
-from typing import List, Dict, Any
+import sys
+import diskcache
+import numpy as np
+from typing import List, Dict, Any, Iterable, Iterator, Tuple, Callable, Awaitable, Set
 from datetime import datetime
+from functools import lru_cache
 from utils.mongo_utils import MongoManager
-from utils.oci_embedding import init_client, get_embeddings
-from utils.oracle_db import DatabaseManager
+from utils.oci_embedding import init_client, get_embeddings, BATCH_SIZE, MODEL_ID
+from utils.oracle_db import DatabaseManager, to_vector_bind
 import oci
+import oracledb
 
 # Configure logging
 logging.basicConfig(
@@ -54,6 +60,56 @@ try:
 except ImportError:
     logger.info("python-dotenv not available, using system environment variables")
 
+# Maximum number of embedding requests (BATCH_SIZE chunks) in flight at once
+EMBED_CONCURRENCY = 16
+
+# Workshop fields that make up the embedding text (in this order); only these are read from MongoDB
+EMBEDDING_FIELDS = (
+    "title", "description", "keywords", "category", "difficulty",
+    "resource_type", "duration_estimate", "author", "text_content",
+)
+# text_content is cut to this many characters by MongoDB before it is sent (about 2K tokens)
+EMBEDDING_TEXT_CAP = 8000
+# Documents per MongoDB cursor batch (fewer getMore round trips; the server still caps a batch at 16MB)
+MONGO_FETCH_BATCH = 1000
+# On-disk cache of embeddings keyed by text hash (shared boilerplate and re-runs are not re-embedded)
+EMBEDDING_CACHE_DIR = ".embedding_cache"
+# Embeddings written to Oracle per executemany while the pipeline is running
+ORACLE_WRITE_BATCH = 500
+# Bind payload limit per executemany; a batch is cut at ORACLE_WRITE_BATCH rows or this many bytes
+ORACLE_WRITE_BYTES = 8_000_000
+# ORA-04030/04031 (out of process/shared memory): the only errors an update batch is split on
+SPLIT_BATCH_ERROR_CODES = {4030, 4031}
+
+# Update query for Oracle - using mongo_id as primary key
+UPDATE_EMBEDDING_SQL = """
+UPDATE admin.livelabs_workshops2 
+SET cohere4_embedding = :embedding
+WHERE mongo_id = :mongo_id
+"""
+
+def _text_key(text: str) -> str:
+    """Embedding cache key: model + blake2b of the embedding text"""
+    return f"{MODEL_ID}:{hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()}"
+
+@lru_cache(maxsize=1)
+def _embedding_cache():
+    """Open the embedding cache on first use (thread- and process-safe)"""
+    return diskcache.Cache(EMBEDDING_CACHE_DIR)
+
+def _byte_bounded_batches(rows: List[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+    """Cut update rows into batches of at most ORACLE_WRITE_BATCH rows and ~ORACLE_WRITE_BYTES of bind data"""
+    batch, batch_bytes = [], 0
+    for row in rows:
+        row_bytes = row['embedding'].itemsize * len(row['embedding']) + len(str(row['mongo_id']))
+        if batch and (len(batch) >= ORACLE_WRITE_BATCH or batch_bytes + row_bytes > ORACLE_WRITE_BYTES):
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append(row)
+        batch_bytes += row_bytes
+    if batch:
+        yield batch
+
 class WorkshopEmbeddingPipeline:
     """ETL pipeline for processing workshop embeddings from MongoDB to Oracle Vector DB"""
     
@@ -83,9 +139,8 @@ class WorkshopEmbeddingPipeline:
         # Initialize Oracle connection
         try:
             self.oracle_manager = DatabaseManager()
-            # Test connection
-            test_result = self.oracle_manager.execute_query("SELECT 1 FROM DUAL", fetch_one=True)
-            if test_result:
+            # Test connection (one ping on a pooled connection; the pool is shared process-wide)
+            if self.oracle_manager.ping():
                 logger.info("✅ Oracle connection established")
             else:
                 raise Exception("Oracle connection test failed")
@@ -108,12 +163,30 @@ class WorkshopEmbeddingPipeline:
         
         return True
     
+    def iter_workshops_from_mongo(self, limit: int = None) -> Iterator[Dict[str, Any]]:
+        """Stream workshops from MongoDB (projected fields, text_content capped server-side,
+        MONGO_FETCH_BATCH documents per round trip)"""
+        return self.mongo_manager.iter_workshops_capped(
+            EMBEDDING_FIELDS, {"text_content": EMBEDDING_TEXT_CAP}, limit=limit, batch_size=MONGO_FETCH_BATCH
+        )
+    
+    def get_embedded_ids(self) -> Set[str]:
+        """mongo_ids that already have an embedding in Oracle (skipped unless process_workshops(force=True))"""
+        try:
+            rows = self.oracle_manager.execute_iter(
+                "SELECT mongo_id FROM admin.livelabs_workshops2 WHERE cohere4_embedding IS NOT NULL"
+            )
+            return {row[0] for row in rows}
+        except Exception as e:
+            logger.error(f"❌ Error loading already embedded workshops: {e}")
+            return set()
+    
     def get_workshops_from_mongo(self, limit: int = None) -> List[Dict[str, Any]]:
         """Retrieve workshops from MongoDB"""
         logger.info(f"=== Retrieving Workshops from MongoDB ===")
         
         try:
-            workshops = self.mongo_manager.find_workshops(limit=limit)
+            workshops = list(self.iter_workshops_from_mongo(limit=limit))
             logger.info(f"✅ Retrieved {len(workshops)} workshops from MongoDB")
             return workshops
         except Exception as e:
@@ -121,118 +194,218 @@ class WorkshopEmbeddingPipeline:
             return []
     
     def prepare_text_for_embedding(self, workshop: Dict[str, Any]) -> str:
-        """Prepare workshop text for embedding generation using entire JSON document"""
-        # Convert the entire workshop document to JSON string
-        # This preserves the complete structure and all data
-        
-        try:
-            # Convert the entire workshop document to JSON
-            json_text = json.dumps(workshop, ensure_ascii=False, default=str)
-            
-            # Limit total length to avoid token limits (typically 8192 tokens for Cohere)
-            # Assuming average 4 characters per token, limit to ~6000 characters
-            if len(json_text) > 6000:
-                json_text = json_text[:6000] + "..."
-            
-            return json_text
-            
-        except Exception as e:
-            logger.error(f"Error converting workshop to JSON: {e}")
-            # Fallback: return a simple string representation
-            return str(workshop)
+        """Prepare workshop text for embedding: one "field: value" line per EMBEDDING_FIELDS entry.
+        text_content arrives capped by MongoDB; anything still too long is truncated by the embedding request (truncate="END")."""
+        lines = []
+        for field in EMBEDDING_FIELDS:
+            value = workshop.get(field)
+            if not value:
+                continue
+            if isinstance(value, list):
+                value = ", ".join(str(item) for item in value)
+            lines.append(f"{field}: {value}")
+        return "\n".join(lines)
     
-    def generate_embeddings(self, workshops: List[Dict[str, Any]]) -> Dict[str, List[float]]:
-        """Generate embeddings for each workshop individually"""
-        logger.info(f"=== Generating Embeddings for {len(workshops)} workshops ===")
+    def generate_embeddings(self, workshops: Iterable[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Generate embeddings in BATCH_SIZE chunks (one OCI request per chunk, chunks sent concurrently).
+        workshops may be a streaming cursor: chunks are embedded while later ones are still being read.
+        A chunk that fails is retried per workshop so one bad text does not lose the rest."""
+        logger.info(f"=== Generating Embeddings ===")
         
         embeddings_dict = {}
         
+        async def collect(chunk_embeddings):
+            embeddings_dict.update(chunk_embeddings)
+        
+        asyncio.run(self._embed_chunks_async(self._iter_chunks(workshops), collect))
+        
+        logger.info(f"✅ Total embeddings generated: {len(embeddings_dict)}")
+        return embeddings_dict
+    
+    def embed_and_store(self, workshops: Iterable[Dict[str, Any]]) -> Tuple[int, bool]:
+        """Embed workshops and write them to Oracle in ORACLE_WRITE_BATCH updates while later chunks
+        are still being read and embedded, so only about one write batch of vectors is held at a time.
+        Returns (number of embeddings generated, True if every write succeeded)."""
+        return asyncio.run(self._embed_and_store_async(workshops))
+    
+    async def _embed_and_store_async(self, workshops: Iterable[Dict[str, Any]]) -> Tuple[int, bool]:
+        write_lock = asyncio.Lock()
+        pending = {}
+        state = {"generated": 0, "ok": True}
+        
+        async def write(batch):
+            # Runs under write_lock: one executemany at a time, in completion order
+            if not await asyncio.to_thread(self.update_oracle_with_embeddings, batch):
+                state["ok"] = False
+        
+        async def store(chunk_embeddings):
+            state["generated"] += len(chunk_embeddings)
+            async with write_lock:
+                pending.update(chunk_embeddings)
+                if len(pending) < ORACLE_WRITE_BATCH:
+                    return
+                batch = dict(pending)
+                pending.clear()
+                await write(batch)
+        
+        await self._embed_chunks_async(self._iter_chunks(workshops), store)
+        if pending:
+            await write(dict(pending))
+        
+        logger.info(f"✅ Total embeddings generated: {state['generated']}")
+        return state["generated"], state["ok"]
+    
+    def _iter_chunks(self, workshops: Iterable[Dict[str, Any]]):
+        """Yield (start, ids, texts) for every BATCH_SIZE workshops; counts them in processed_count"""
+        start, ids, texts = 0, [], []
         for i, workshop in enumerate(workshops, 1):
+            self.processed_count += 1
             mongo_id = workshop.get('_id')  # MongoDB _id field
             if not mongo_id:
                 logger.warning(f"⚠️  Workshop {i} missing _id field, skipping")
                 continue
+            ids.append(mongo_id)
+            texts.append(self.prepare_text_for_embedding(workshop))
             
+            # Log a sample of the embedding text for the first workshop
+            if start == 0 and len(texts) == 1:
+                logger.info(f"Sample embedding text for workshop {mongo_id}:")
+                logger.info(f"  Length: {len(texts[0])} characters")
+                logger.info(f"  Preview: {texts[0][:200]}...")
+            
+            if len(ids) == BATCH_SIZE:
+                yield start, ids, texts
+                start, ids, texts = start + len(ids), [], []
+        if ids:
+            yield start, ids, texts
+    
+    async def _embed_chunks_async(self, chunks, on_chunk: Callable[[Dict[str, np.ndarray]], Awaitable[None]]):
+        """Embed chunks concurrently (at most EMBED_CONCURRENCY OCI requests in flight) and hand each
+        chunk's {mongo_id: embedding} to on_chunk as soon as it completes.
+        The next chunk is only read once a request slot is free, so a slow OCI side also slows
+        the MongoDB reads instead of buffering the whole collection."""
+        semaphore = asyncio.Semaphore(EMBED_CONCURRENCY)
+        chunk_iter = iter(chunks)
+        tasks = []
+        
+        async def embed(chunk):
             try:
-                # Prepare text for this workshop
-                text = self.prepare_text_for_embedding(workshop)
-                
-                # Log a sample of the embedding text for the first workshop
-                if i == 1:
-                    logger.info(f"Sample JSON embedding text for workshop {mongo_id}:")
-                    logger.info(f"  Length: {len(text)} characters")
-                    logger.info(f"  Preview: {text[:200]}...")
-                
-                # Generate embedding for this workshop
-                embeddings = get_embeddings(self.oci_client, self.compartment_id, [text])
-                
-                if embeddings and len(embeddings) == 1:
-                    # Store the embedding for this workshop
-                    embeddings_dict[mongo_id] = embeddings[0]
-                    logger.info(f"✅ Generated embedding for workshop {mongo_id} ({i}/{len(workshops)})")
-                else:
-                    logger.warning(f"⚠️  Failed to generate embedding for workshop {mongo_id}")
-                    
-            except Exception as e:
-                logger.error(f"❌ Error generating embedding for workshop {mongo_id}: {e}")
+                chunk_embeddings = await asyncio.to_thread(self._embed_chunk, *chunk)
+            finally:
+                # Free the slot before on_chunk so the next request is not held up by an Oracle write
+                semaphore.release()
+            await on_chunk(chunk_embeddings)
+        
+        while True:
+            await semaphore.acquire()
+            # Cursor reads (getMore round trips) block, so pull the next chunk off the event loop
+            chunk = await asyncio.to_thread(next, chunk_iter, None)
+            if chunk is None:
+                semaphore.release()
+                break
+            tasks.append((chunk, asyncio.create_task(embed(chunk))))
+        
+        results = await asyncio.gather(*(task for _, task in tasks), return_exceptions=True)
+        for (start, chunk_ids, _), result in zip((chunk for chunk, _ in tasks), results):
+            if isinstance(result, Exception):
+                logger.error(f"❌ Error embedding/storing workshops {start + 1}-{start + len(chunk_ids)}: {result}")
+    
+    def _embed_chunk(self, start: int, chunk_ids: List[str], chunk_texts: List[str]) -> Dict[str, np.ndarray]:
+        """Embed one chunk. Texts already in the embedding cache (identical boilerplate, earlier runs)
+        are not sent again and duplicates within the chunk are sent once; the rest go in a single
+        request, retried per text if that request fails."""
+        cache = _embedding_cache()
+        keys = [_text_key(text) for text in chunk_texts]
+        vectors = {}
+        to_embed = {}
+        for key, text in zip(keys, chunk_texts):
+            if key in vectors or key in to_embed:
                 continue
+            cached = cache.get(key)
+            if cached is not None:
+                vectors[key] = cached
+            else:
+                to_embed[key] = text
         
-        logger.info(f"✅ Total embeddings generated: {len(embeddings_dict)}")
-        return embeddings_dict
+        if to_embed:
+            # Embeddings come back in input order, so they map back to the keys by index
+            embeddings = get_embeddings(self.oci_client, self.compartment_id, list(to_embed.values()))
+            if len(embeddings) == len(to_embed):
+                vectors.update(zip(to_embed, embeddings))
+            else:
+                logger.warning(f"⚠️  Batch embedding failed for workshops {start + 1}-{start + len(chunk_ids)}, retrying individually")
+                for key, text in to_embed.items():
+                    try:
+                        embeddings = get_embeddings(self.oci_client, self.compartment_id, [text])
+                        if len(embeddings) == 1:
+                            vectors[key] = embeddings[0]
+                    except Exception as e:
+                        logger.error(f"❌ Error generating embedding for text {key}: {e}")
+            for key in to_embed:
+                if key in vectors:
+                    cache.set(key, vectors[key])
+        
+        chunk_embeddings = {}
+        for mongo_id, key in zip(chunk_ids, keys):
+            if key in vectors:
+                chunk_embeddings[mongo_id] = vectors[key]
+            else:
+                logger.warning(f"⚠️  Failed to generate embedding for workshop {mongo_id}")
+        logger.info(f"✅ Generated embeddings for workshops {start + 1}-{start + len(chunk_ids)} "
+                    f"({len(to_embed)} sent, {len(chunk_ids) - len(to_embed)} cached or duplicate)")
+        return chunk_embeddings
     
-    def update_oracle_with_embeddings(self, embeddings_dict: Dict[str, List[float]]) -> bool:
-        """Update Oracle database with embeddings"""
+    def update_oracle_with_embeddings(self, embeddings_dict: Dict[str, np.ndarray]) -> bool:
+        """Update Oracle database with embeddings (array DML UPDATEs in byte-bounded batches)"""
         logger.info(f"=== Updating Oracle Database ===")
         
         if not embeddings_dict:
             logger.warning("No embeddings to update")
             return True
         
-        success_count = 0
-        error_count = 0
+        # Bind the float32 embeddings natively as Oracle VECTORs
+        rows = [
+            {'embedding': to_vector_bind(embedding), 'mongo_id': mongo_id}
+            for mongo_id, embedding in embeddings_dict.items()
+        ]
         
-        for mongo_id, embedding in embeddings_dict.items():
-            try:
-                # Convert embedding list to string for Oracle storage
-                embedding_str = json.dumps(embedding)
-                
-                # Update query for Oracle - using mongo_id as primary key
-                update_query = """
-                UPDATE admin.livelabs_workshops2 
-                SET cohere4_embedding = :embedding
-                WHERE mongo_id = :mongo_id
-                """
-                
-                params = {
-                    'embedding': embedding_str,
-                    'mongo_id': mongo_id
-                }
-                
-                # Execute update
-                result = self.oracle_manager.execute_query(
-                    update_query, 
-                    params=params, 
-                    commit=True
-                )
-                
-                if result is not None:
-                    success_count += 1
-                    if success_count % 10 == 0:
-                        logger.info(f"Updated {success_count} workshops so far...")
-                else:
-                    error_count += 1
-                    logger.warning(f"⚠️  No rows updated for mongo_id: {mongo_id}")
-                    
-            except Exception as e:
-                error_count += 1
-                logger.error(f"❌ Error updating workshop {mongo_id}: {e}")
-                continue
+        updated = 0
+        try:
+            for batch in _byte_bounded_batches(rows):
+                updated += self._execute_update_batch(batch)
+        except Exception as e:
+            logger.error(f"❌ Error updating workshop embeddings: {e}")
+            return False
+        finally:
+            self.updated_count += updated
         
-        logger.info(f"✅ Oracle update completed: {success_count} successful, {error_count} errors")
-        return error_count == 0
+        missing = len(rows) - updated
+        if missing:
+            logger.warning(f"⚠️  {missing} embeddings were not applied (failed or no matching mongo_id)")
+        logger.info(f"✅ Oracle update completed: {updated} successful, {missing} errors")
+        return missing == 0
     
-    def process_workshops(self, limit: int = None):
-        """Main processing method"""
+    def _execute_update_batch(self, rows: List[Dict[str, Any]]) -> int:
+        """executemany one batch (single commit); when the database runs out of memory for it
+        (SPLIT_BATCH_ERROR_CODES) split it in half and retry each half. Any other error is raised
+        as is. Returns the number of updated rows."""
+        try:
+            # Failing rows are logged by execute_many (batch errors) and the rest are still applied
+            return self.oracle_manager.execute_many(
+                UPDATE_EMBEDDING_SQL,
+                rows,
+                input_types={'embedding': oracledb.DB_TYPE_VECTOR}
+            )
+        except oracledb.DatabaseError as e:
+            error = e.args[0] if e.args else None
+            if len(rows) == 1 or getattr(error, "code", None) not in SPLIT_BATCH_ERROR_CODES:
+                raise
+            half = len(rows) // 2
+            logger.warning(f"⚠️  Update batch of {len(rows)} rows failed ({e}), retrying as two batches of ~{half}")
+            return self._execute_update_batch(rows[:half]) + self._execute_update_batch(rows[half:])
+    
+    def process_workshops(self, limit: int = None, force: bool = False):
+        """Main processing method. Workshops that already have an embedding are skipped unless force=True."""
         logger.info("=== Starting Workshop Embedding Processing ===")
         
         # Initialize connections
@@ -241,25 +414,26 @@ class WorkshopEmbeddingPipeline:
             return False
         
         try:
-            # Get workshops from MongoDB
-            workshops = self.get_workshops_from_mongo(limit=limit)
-            if not workshops:
+            # Mongo read → OCI embedding → Oracle update, overlapped in one streaming pipeline
+            workshops = self.iter_workshops_from_mongo(limit=limit)
+            if not force:
+                embedded_ids = self.get_embedded_ids()
+                logger.info(f"Skipping {len(embedded_ids)} workshops that already have embeddings")
+                workshops = (workshop for workshop in workshops if workshop.get('_id') not in embedded_ids)
+            generated, success = self.embed_and_store(workshops)
+            if not self.processed_count:
+                if not force:
+                    logger.info("✅ All workshops already have embeddings (use --force to re-embed)")
+                    return True
                 logger.error("❌ No workshops retrieved from MongoDB")
                 return False
+            logger.info(f"Processed {self.processed_count} workshops")
             
-            self.processed_count = len(workshops)
-            logger.info(f"Processing {self.processed_count} workshops")
-            
-            # Generate embeddings
-            embeddings_dict = self.generate_embeddings(workshops)
-            if not embeddings_dict:
+            if not generated:
                 logger.error("❌ No embeddings generated")
                 return False
             
-            # Update Oracle database
-            success = self.update_oracle_with_embeddings(embeddings_dict)
             if success:
-                self.updated_count = len(embeddings_dict)
                 logger.info(f"✅ Successfully updated {self.updated_count} workshops")
             else:
                 logger.error("❌ Oracle update failed")
@@ -314,7 +488,8 @@ def main():
     
     # Run pipeline with parameters (adjust as needed)
     success = pipeline.process_workshops(
-        #limit=50  # Process first 50 workshops (adjust or remove for all)
+        #limit=50,  # Process first 50 workshops (adjust or remove for all)
+        force="--force" in sys.argv  # Re-embed workshops that already have embeddings
     )
     
     if success:
@@ -6,10 +6,11 @@ Provides automated data collection with pagination and content parsing
 """
 
 import logging
-import time
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.action_chains import ActionChains
-from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
 
 # Import common utilities
 from utils.selenium_utils import SeleniumDriver
@@ -20,6 +21,12 @@ from utils.mongo_utils import MongoManager
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Locators used on every page (built once)
+NEXT_BUTTON = (By.CSS_SELECTOR, "span.a-Icon.icon-next")
+WORKSHOP_CARDS = (By.CSS_SELECTOR, "div.a-CardView")
+# Maximum seconds to wait for the card list to (re)render
+PAGE_TIMEOUT = 20
+
 class WorkshopTextScraper:
     """Web scraper for Oracle LiveLabs workshop content extraction"""
     
@@ -27,13 +34,15 @@ class WorkshopTextScraper:
         self.base_url = "https://apexapps.oracle.com/pls/apex/r/dbpm/livelabs/livelabs-workshop-cards"
         self.driver_manager = SeleniumDriver(headless=headless)
         self.workshop_parser = WorkshopParser()
-        self.mongo_manager = MongoManager() if save_to_mongo else None
+        self.mongo_manager = MongoManager(fast_insert=True) if save_to_mongo else None
         self.all_workshops = []
+        # Pages that contributed workshops, counted as they are parsed (no rescan of all_workshops on save)
+        self.pages_with_workshops = 0
         
     def has_next_page(self):
         """Check if there's a next page available"""
         try:
-            next_button = self.driver_manager.driver.find_element(By.CSS_SELECTOR, "span.a-Icon.icon-next")
+            next_button = self.driver_manager.driver.find_element(*NEXT_BUTTON)
             parent_element = next_button.find_element(By.XPATH, "./..")
             parent_class = parent_element.get_attribute("class") or ""
             
@@ -54,20 +63,22 @@ class WorkshopTextScraper:
     def go_to_next_page(self):
         """Navigate to the next page"""
         try:
-            next_button = self.driver_manager.driver.find_element(By.CSS_SELECTOR, "span.a-Icon.icon-next")
+            driver = self.driver_manager.driver
+            next_button = driver.find_element(*NEXT_BUTTON)
             parent_element = next_button.find_element(By.XPATH, "./..")
+            # The current cards are replaced when the next page renders
+            first_card = driver.find_element(*WORKSHOP_CARDS)
             
             # Scroll to the button
-            self.driver_manager.driver.execute_script("arguments[0].scrollIntoView(true);", parent_element)
-            time.sleep(2)
+            driver.execute_script("arguments[0].scrollIntoView(true);", parent_element)
             
             # Try different click methods
             try:
                 parent_element.click()
             except Exception:
-                self.driver_manager.driver.execute_script("arguments[0].click();", parent_element)
+                driver.execute_script("arguments[0].click();", parent_element)
             
-            time.sleep(5)
+            self.wait_for_cards(stale=first_card)
             logger.info("Successfully navigated to next page")
             return True
             
@@ -78,36 +89,34 @@ class WorkshopTextScraper:
             logger.error(f"Error navigating to next page: {e}")
             return False
     
+    def wait_for_cards(self, stale=None):
+        """Wait until the workshop cards are rendered; with stale, first wait for that old card to be replaced"""
+        wait = WebDriverWait(self.driver_manager.driver, PAGE_TIMEOUT)
+        try:
+            if stale is not None:
+                wait.until(EC.staleness_of(stale))
+            wait.until(EC.presence_of_element_located(WORKSHOP_CARDS))
+        except TimeoutException:
+            logger.warning(f"Workshop cards not rendered after {PAGE_TIMEOUT}s, continuing")
+    
     def scrape_all_pages(self, max_pages=100):
         """Scrape all workshops from all pages"""
+        html_pages = []
         try:
             self.driver_manager.setup_driver()
             logger.info("Starting workshop text scraping...")
             
             self.driver_manager.driver.get(self.base_url)
-            time.sleep(5)
+            self.wait_for_cards()
             
             page_number = 1
             
             while page_number <= max_pages:
                 logger.info(f"Scraping page {page_number}...")
                 
-                # Wait for page to load
-                time.sleep(5)
-                html_content = self.driver_manager.driver.page_source
-                
-                # Extract workshops from current page
-                page_workshops = self.workshop_parser.extract_workshops_beautifulsoup(html_content)
-                
-                if page_workshops:
-                    # Add page number to each workshop
-                    for workshop in page_workshops:
-                        workshop['page_number'] = page_number
-                    
-                    self.all_workshops.extend(page_workshops)
-                    logger.info(f"Found {len(page_workshops)} workshops on page {page_number}")
-                else:
-                    logger.warning(f"No workshops found on page {page_number}")
+                # Cards are already rendered (wait_for_cards after load / navigation)
+                # Keep the HTML; all pages are parsed together once navigation is done
+                html_pages.append(self.driver_manager.driver.page_source)
                 
                 # Check if there's a next page
                 if self.has_next_page():
@@ -119,12 +128,30 @@ class WorkshopTextScraper:
                     logger.info("Reached the last page")
                     break
             
-            logger.info(f"Scraping completed. Total workshops found: {len(self.all_workshops)} across {page_number} pages")
-            
         except Exception as e:
             logger.error(f"Error during scraping: {e}")
         finally:
             self.driver_manager.quit()
+        
+        try:
+            self.parse_pages(html_pages)
+        except Exception as e:
+            logger.error(f"Error parsing scraped pages: {e}")
+        logger.info(f"Scraping completed. Total workshops found: {len(self.all_workshops)} across {len(html_pages)} pages")
+    
+    def parse_pages(self, html_pages):
+        """Extract workshops from the collected page HTMLs in parallel"""
+        for page_number, page_workshops in enumerate(self.workshop_parser.extract_workshops_many(html_pages), 1):
+            if page_workshops:
+                # Add page number to each workshop
+                for workshop in page_workshops:
+                    workshop['page_number'] = page_number
+                
+                self.all_workshops.extend(page_workshops)
+                self.pages_with_workshops += 1
+                logger.info(f"Found {len(page_workshops)} workshops on page {page_number}")
+            else:
+                logger.warning(f"No workshops found on page {page_number}")
     
     def save_results(self, filename="livelabs_workshops.json"):
         """Save results to JSON and optionally MongoDB"""
@@ -132,7 +159,7 @@ class WorkshopTextScraper:
         self.workshop_parser.save_workshops_to_json(
             self.all_workshops, 
             filename, 
-            total_pages=len(set(w.get('page_number', 1) for w in self.all_workshops))
+            total_pages=self.pages_with_workshops
         )
         
         # Save to MongoDB if enabled